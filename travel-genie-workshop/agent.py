@@ -3,10 +3,13 @@ TravelGenie Live Agent - Autonomous AI Travel Concierge with Real APIs
 Built with LangGraph and Vertex AI (Gemini)
 """
 
+import contextvars
 import operator
 import json
 import os
-from typing import Annotated, Sequence, TypedDict, Optional
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Annotated, List, Sequence, TypedDict, Optional
 from datetime import datetime, timedelta
 
 from langchain_core.messages import BaseMessage, ToolMessage, HumanMessage, AIMessage, SystemMessage
@@ -20,6 +23,18 @@ from apis.weather_client import WeatherClient
 from apis.places_client import PlacesClient
 from apis.events_client import EventsClient
 from apis.ticketmaster_client import TicketmasterClient
+from apis.blobstore import blob_store, make_ref, parse_ref
+from apis.http import request_deadline
+from apis.memo import turn_scope
+from apis.models import dumps
+from apis.geo import near_point, rank_by_proximity
+from apis.geocode import geocode_cache
+from apis.planner import plan_days
+from apis.prefetch import Prefetcher
+from apis.registry import ProviderRegistry
+from apis.price_calendar import PriceCalendar
+from apis.event_feed import EventAggregator
+from apis.warmer import CacheWarmer
 
 # --- System Prompt ---
 SYSTEM_PROMPT = """You are TravelGenie, an expert AI travel concierge powered by real-time data.
@@ -35,213 +50,357 @@ Your capabilities include:
 Guidelines:
 - Always ask for dates in YYYY-MM-DD format when not provided
 - For flights, use 3-letter IATA airport codes (JFK, LAX, CDG, etc.)
+- For flexible dates ("cheapest day that week"), call get_flight_price_calendar once instead of several search_flights calls
+- For trips with several cities (NYC → Paris → Rome → NYC), call plan_multi_city_trip once instead of separate flight, hotel and weather calls per stop
 - Mention that bookings need to be completed on actual websites
 - Use weather data to make packing and activity recommendations
 
 Remember: You're providing REAL, LIVE data. All suggestions are actual places and events!"""
 
-# --- Initialize API Clients (Lazy Loading) ---
-_clients = {}
+# --- Turn Budget ---
+# A single user turn may loop agent -> tools -> agent many times. Both budgets
+# bound that loop; once either runs out the model must answer with what it has.
+TURN_TIME_BUDGET_S = float(os.getenv("TURN_TIME_BUDGET_S", "60"))
+TURN_TOOL_CALL_BUDGET = int(os.getenv("TURN_TOOL_CALL_BUDGET", "12"))
 
-def get_duffel_client() -> Optional[DuffelClient]:
-    if "duffel" not in _clients:
-        try:
-            _clients["duffel"] = DuffelClient()
-        except ValueError:
-            _clients["duffel"] = None
-    return _clients["duffel"]
+BUDGET_EXHAUSTED_PROMPT = """The time or tool budget for this request has run out. Do not call any more tools.
+Answer the user now using only the data gathered above, and briefly mention anything you could not look up."""
 
-def get_booking_client() -> Optional[BookingClient]:
-    if "booking" not in _clients:
-        try:
-            _clients["booking"] = BookingClient()
-        except ValueError:
-            _clients["booking"] = None
-    return _clients["booking"]
+# --- Provider Registry ---
+providers = ProviderRegistry({
+    "duffel": ("Duffel (Flights)", DuffelClient),
+    "booking": ("Booking.com (Hotels)", BookingClient),
+    "weather": ("OpenWeatherMap", WeatherClient),
+    "places": ("Google Places", PlacesClient),
+    "events": ("SerpAPI (Events)", EventsClient),
+    "ticketmaster": ("Ticketmaster", TicketmasterClient),
+})
 
-def get_weather_client() -> Optional[WeatherClient]:
-    if "weather" not in _clients:
-        try:
-            _clients["weather"] = WeatherClient()
-        except ValueError:
-            _clients["weather"] = None
-    return _clients["weather"]
+# Startup waits this long for the probes so the first page shows real status
+PROVIDER_STARTUP_WAIT_S = float(os.getenv("PROVIDER_STARTUP_WAIT_S", "2"))
 
-def get_places_client() -> Optional[PlacesClient]:
-    if "places" not in _clients:
-        try:
-            _clients["places"] = PlacesClient()
-        except ValueError:
-            _clients["places"] = None
-    return _clients["places"]
+def start_providers() -> None:
+    """Probe every provider concurrently so dead keys and cold connections surface before the first request."""
+    providers.start(wait_s=PROVIDER_STARTUP_WAIT_S)
 
-def get_events_client() -> Optional[EventsClient]:
-    """Get or create Events client."""
-    if "events" not in _clients:
-        try:
-            _clients["events"] = EventsClient()
-        except ValueError:
-            _clients["events"] = None
-    return _clients["events"]
 
-def get_ticketmaster_client() -> Optional[TicketmasterClient]:
-    """Get or create Ticketmaster client."""
-    if "ticketmaster" not in _clients:
-        try:
-            _clients["ticketmaster"] = TicketmasterClient()
-        except ValueError:
-            _clients["ticketmaster"] = None
-    return _clients["ticketmaster"]
+# --- Speculative Prefetch & Cache Warming ---
+prefetcher = Prefetcher()
+cache_warmer = CacheWarmer()
+
+def start_cache_warmer() -> None:
+    """Keep popular destinations warm in the background (disable with CACHE_WARMER_ENABLED=false)."""
+    if os.getenv("CACHE_WARMER_ENABLED", "true").lower() in ("0", "false", "no"):
+        return
+    cache_warmer.start(weather_client=providers.get("weather"), places_client=providers.get("places"), events_client=providers.get("events"))
+
+def prefetch_destination(destination: str, start_date: str, end_date: Optional[str] = None) -> None:
+    """Warm weather/attractions/restaurants for a destination the user just searched."""
+    prefetcher.prefetch_destination(destination, start_date, end_date, weather_client=providers.get("weather"), places_client=providers.get("places"))
 
 
 # --- Define Tools with Real APIs ---
 
 @tool
-def search_flights(origin: str, destination: str, departure_date: str, passengers: int = 1, return_date: str = None) -> str:
-    """Search for REAL available flights using Duffel API."""
+def search_flights(origin: str, destination: str, departure_date: str, passengers: int = 1, return_date: str = None, preference: str = "balanced") -> str:
+    """Search for REAL available flights using Duffel API. preference: "cheapest", "fastest" or "balanced"."""
     print(f"✈️ Searching REAL flights: {origin} → {destination}")
+    return dumps(find_flights(origin, destination, departure_date, passengers, return_date, preference))
+
+
+def find_flights(origin: str, destination: str, departure_date: str, passengers: int = 1, return_date: str = None, preference: str = "balanced", max_results: int = 5) -> dict:
+    cache_warmer.record_query(destination)
     
-    client = get_duffel_client()
+    client = providers.get("duffel")
     if not client:
-        return json.dumps({"error": "Duffel API not configured. Set DUFFEL_API_KEY."})
+        return {"error": "Duffel API not configured. Set DUFFEL_API_KEY."}
     
     origin_code = normalize_airport_code(origin)
     dest_code = normalize_airport_code(destination)
     
-    result = client.search_flights(origin=origin_code, destination=dest_code, departure_date=departure_date, return_date=return_date, adults=passengers)
-    return json.dumps(result, indent=2)
+    result = client.search_flights(origin=origin_code, destination=dest_code, departure_date=departure_date, return_date=return_date, adults=passengers, preference=preference, max_results=max_results)
+    if "error" not in result:
+        prefetch_destination(destination, departure_date, return_date)
+    return result
+
+
+@tool
+def get_flight_price_calendar(origin: str, destination: str, around_date: str, window_days: int = 3, passengers: int = 1) -> str:
+    """Find the cheapest day to fly: lowest REAL fares for every date within ±window_days (max 7) of around_date, in one call."""
+    print(f"📆 Building price calendar: {origin} → {destination} around {around_date}")
+    cache_warmer.record_query(destination)
+    
+    client = providers.get("duffel")
+    if not client:
+        return json.dumps({"error": "Duffel API not configured. Set DUFFEL_API_KEY."})
+    
+    calendar = PriceCalendar(client)
+    result = calendar.search(normalize_airport_code(origin), normalize_airport_code(destination), around_date, window_days=window_days, adults=passengers)
+    return dumps(result)
+
+
+# Results farther than this from the geocoded city centre are usually a same-named place elsewhere
+CITY_RADIUS_KM = 60
+
+def near_city(records: list, city: str) -> list:
+    """Drop results outside the city, using the shared geocode cache when the city is known."""
+    centre = geocode_cache.get(city)
+    if not centre:
+        return list(records)
+    return near_point(records, centre["latitude"], centre["longitude"], CITY_RADIUS_KM)
+
+
+def with_proximity(result: dict, location: str) -> dict:
+    """Add the hotels closest to the city's top attractions, when both have coordinates."""
+    places_client = providers.get("places")
+    if not places_client:
+        return result
+    attractions = places_client.get_attractions(location)
+    if "error" in attractions:
+        return result
+    closest = rank_by_proximity(near_city(result.get("hotels", []), location), near_city(attractions.get("attractions", []), location))
+    return {**result, "closest_to_sights": closest} if closest else result
 
 
 @tool
 def search_hotels(location: str, checkin_date: str, checkout_date: str, guests: int = 2) -> str:
-    """Search for REAL hotels using Booking.com API with Google Places fallback."""
+    """Search for REAL hotels using Booking.com API with Google Places fallback. Includes the hotels closest to the top sights."""
     print(f"🏨 Searching REAL hotels in {location}")
+    return dumps(find_hotels(location, checkin_date, checkout_date, guests))
+
+
+def find_hotels(location: str, checkin_date: str, checkout_date: str, guests: int = 2) -> dict:
+    cache_warmer.record_query(location)
     
-    client = get_booking_client()
+    client = providers.get("booking")
     if client:
         result = client.search_hotels(location_name=location, check_in_date=checkin_date, check_out_date=checkout_date, adults=guests)
         if "error" not in result:
-            return json.dumps(result, indent=2)
+            prefetch_destination(location, checkin_date, checkout_date)
+            return with_proximity(result, location)
     
-    places_client = get_places_client()
+    places_client = providers.get("places")
     if places_client:
-        return json.dumps(places_client.get_hotels(location), indent=2)
+        result = places_client.get_hotels(location)
+        if "error" not in result:
+            prefetch_destination(location, checkin_date, checkout_date)
+            result = with_proximity(result, location)
+        return result
     
-    return json.dumps({"error": "No hotel API configured."})
+    return {"error": "No hotel API configured."}
 
 
 @tool
 def get_weather(location: str, start_date: str = None, end_date: str = None) -> str:
     """Get REAL weather data from OpenWeatherMap API."""
     print(f"🌤️ Getting REAL weather for {location}")
+    cache_warmer.record_query(location)
     
-    client = get_weather_client()
+    client = providers.get("weather")
     if not client:
         return json.dumps({"error": "OpenWeatherMap API not configured."})
     
     if start_date and end_date:
         result = client.get_weather_for_trip(location, start_date, end_date)
     else:
-        current = client.get_current_weather(location)
-        forecast = client.get_forecast(location)
-        if "error" in current:
-            return json.dumps(current)
-        result = {**current, "forecast": forecast.get("forecast", [])}
+        result = client.get_conditions(location)
+    
+    return dumps(result)
+
+
+@tool
+def get_weather_for_cities(locations: List[str]) -> str:
+    """Get REAL current weather and 5-day forecasts for several cities at once (multi-city trips, comparisons)."""
+    print(f"🌤️ Getting REAL weather for {len(locations)} cities")
+    for location in locations:
+        cache_warmer.record_query(location)
+    
+    client = providers.get("weather")
+    if not client:
+        return json.dumps({"error": "OpenWeatherMap API not configured."})
     
-    return json.dumps(result, indent=2)
+    return dumps(client.get_forecasts(locations))
 
 
 @tool
-def get_attractions(location: str) -> str:
-    """Get REAL tourist attractions from Google Places API."""
+def get_attractions(location: str, names_only: bool = False) -> str:
+    """Get REAL tourist attractions from Google Places API. Set names_only=True for a quick list of names."""
     print(f"🎯 Getting REAL attractions in {location}")
+    cache_warmer.record_query(location)
     
-    client = get_places_client()
+    client = providers.get("places")
     if not client:
         return json.dumps({"error": "Google Places API not configured."})
     
-    return json.dumps(client.get_attractions(location), indent=2)
+    return dumps(client.get_attractions(location, names_only=names_only))
 
 
 @tool
-def get_restaurants(location: str, cuisine: str = None) -> str:
-    """Get REAL restaurant recommendations from Google Places API."""
+def get_restaurants(location: str, cuisine: str = None, names_only: bool = False) -> str:
+    """Get REAL restaurant recommendations from Google Places API. Set names_only=True for a quick list of names."""
     print(f"🍽️ Getting REAL restaurants in {location}")
+    cache_warmer.record_query(location)
     
-    client = get_places_client()
+    client = providers.get("places")
     if not client:
         return json.dumps({"error": "Google Places API not configured."})
     
-    return json.dumps(client.get_restaurants(location, cuisine), indent=2)
+    return dumps(client.get_restaurants(location, cuisine, names_only=names_only))
 
 
 @tool
 def get_events(location: str, event_type: str = None, date_range: str = "week") -> str:
-    """Get REAL events happening in a location via SerpAPI."""
+    """Get REAL events happening in a location, merged and deduplicated across SerpAPI and Ticketmaster."""
     print(f"🎭 Getting REAL events in {location}")
+    cache_warmer.record_query(location)
     
-    client = get_events_client()
-    if client:
-        result = client.get_events(location, query=event_type, date_filter=date_range)
-        if "error" not in result or result.get("events"):
-            return json.dumps(result, indent=2)
-
-    # Fallback to Ticketmaster
-    tm_client = get_ticketmaster_client()
-    if tm_client:
-        city = location.split(",")[0].strip()
-        result = tm_client.search_events(city=city, keyword=event_type)
-        if "error" not in result:
-            return json.dumps(result, indent=2)
-            
-    return json.dumps({"error": "No events API configured."})
+    aggregator = EventAggregator(events_client=providers.get("events"), ticketmaster_client=providers.get("ticketmaster"))
+    return dumps(aggregator.get_events(location, query=event_type, date_filter=date_range))
 
 
 @tool
 def create_itinerary(destination: str, start_date: str, end_date: str, interests: str = "general") -> str:
     """Create a personalized itinerary using REAL data from all APIs."""
     print(f"📅 Creating REAL itinerary for {destination}")
+    cache_warmer.record_query(destination)
     
     itinerary_data = {"destination": destination, "dates": f"{start_date} to {end_date}", "interests": interests}
     
-    weather_client = get_weather_client()
+    weather_client = providers.get("weather")
     if weather_client:
         weather = weather_client.get_weather_for_trip(destination, start_date, end_date)
         if "error" not in weather:
             itinerary_data["weather"] = {"summary": weather.get("current_weather", {}).get("description", ""), "packing_tips": weather.get("packing_suggestions", [])}
     
-    places_client = get_places_client()
+    places_client = providers.get("places")
     if places_client:
         attractions = places_client.get_attractions(destination)
-        if "error" not in attractions:
-            itinerary_data["top_attractions"] = attractions.get("attractions", [])[:8]
+        attractions = [] if "error" in attractions else near_city(attractions.get("attractions", []), destination)
         restaurants = places_client.get_restaurants(destination)
-        if "error" not in restaurants:
-            itinerary_data["recommended_restaurants"] = restaurants.get("restaurants", [])[:5]
+        restaurants = [] if "error" in restaurants else near_city(restaurants.get("restaurants", []), destination)
+        try:
+            day_plan = plan_days(attractions, restaurants, start_date, end_date)
+        except ValueError:
+            day_plan = []
+        if day_plan:
+            # Stops are already grouped by area and ordered into walking routes
+            itinerary_data["day_plan"] = day_plan
+        else:
+            itinerary_data["top_attractions"] = attractions[:8]
+            itinerary_data["recommended_restaurants"] = restaurants[:5]
     
-    events_client = get_events_client()
+    events_client = providers.get("events")
     if events_client:
         events = events_client.get_events(destination, date_filter="month")
         if "error" not in events:
             itinerary_data["upcoming_events"] = events.get("events", [])[:5]
     
     itinerary_data["note"] = "This itinerary uses REAL data. All attractions and events listed are actual!"
-    return json.dumps(itinerary_data, indent=2)
+    return dumps(itinerary_data)
+
+
+# Leg flights, stop hotels and stop weather all run at once
+MULTI_CITY_WORKERS = int(os.getenv("MULTI_CITY_WORKERS", "8"))
+
+@tool
+def plan_multi_city_trip(origin: str, stops: List[str], dates: List[str], passengers: int = 1, guests: int = 2, preference: str = "balanced") -> str:
+    """Plan a whole multi-city trip in ONE call: REAL flights for every leg plus hotels and weather for every stop.
+
+    origin: home city or airport, e.g. "NYC". stops: cities visited in order, e.g. ["Paris", "Rome"].
+    dates: YYYY-MM-DD departure date of each leg, one more than stops (the last is the flight home),
+    e.g. ["2026-05-01", "2026-05-05", "2026-05-09"] for NYC→Paris→Rome→NYC.
+    """
+    if not stops:
+        return json.dumps({"error": "Give at least one stop."})
+    if len(dates) != len(stops) + 1:
+        return json.dumps({"error": f"Need {len(stops) + 1} dates (one per leg, including the flight home), got {len(dates)}."})
+    try:
+        parsed = [datetime.strptime(d, "%Y-%m-%d") for d in dates]
+    except ValueError:
+        return json.dumps({"error": "Dates must be YYYY-MM-DD."})
+    if any(later < earlier for earlier, later in zip(parsed, parsed[1:])):
+        return json.dumps({"error": "Dates must be in travel order."})
+
+    route = [origin] + list(stops) + [origin]
+    print(f"🗺️ Planning multi-city trip: {' → '.join(route)}")
+
+    weather_client = providers.get("weather")
+    tasks = {}
+    for i, date in enumerate(dates):
+        tasks[("leg", i)] = (find_flights, (route[i], route[i + 1], date, passengers, None, preference))
+    for i, city in enumerate(stops):
+        tasks[("hotels", i)] = (find_hotels, (city, dates[i], dates[i + 1], guests))
+        if weather_client:
+            tasks[("weather", i)] = (weather_client.get_weather_for_stay, (city, dates[i], dates[i + 1]))
+
+    # Each task runs in a copy of this context so the turn memo still applies
+    with ThreadPoolExecutor(max_workers=min(MULTI_CITY_WORKERS, len(tasks))) as executor:
+        futures = {key: executor.submit(contextvars.copy_context().run, func, *args) for key, (func, args) in tasks.items()}
+    results = {}
+    for key, future in futures.items():
+        try:
+            results[key] = future.result()
+        except Exception as e:
+            results[key] = {"error": str(e)}
+
+    legs = []
+    for i, date in enumerate(dates):
+        flights = results[("leg", i)]
+        legs.append({"from": route[i], "to": route[i + 1], "date": date, "flights": flights.get("flights", [])[:3] if "error" not in flights else flights})
+    stays = []
+    for i, city in enumerate(stops):
+        hotels = results[("hotels", i)]
+        stay = {"city": city, "check_in": dates[i], "check_out": dates[i + 1], "nights": (parsed[i + 1] - parsed[i]).days, "hotels": hotels.get("hotels", [])[:5] if "error" not in hotels else hotels}
+        if "closest_to_sights" in hotels:
+            stay["closest_to_sights"] = hotels["closest_to_sights"][:3]
+        weather = results.get(("weather", i))
+        if weather:
+            stay["weather"] = weather if "error" in weather else {key: weather[key] for key in ("forecast", "packing_suggestions", "note") if key in weather}
+        stays.append(stay)
+
+    trip = {"route": route, "legs": legs, "stays": stays}
+    leg_results = [results[("leg", i)] for i in range(len(dates))]
+    lowest = [leg.get("lowest_price") for leg in leg_results]
+    currencies = {leg["flights"][0].currency for leg in leg_results if leg.get("flights")}
+    if all(price is not None for price in lowest) and len(currencies) == 1:
+        trip["lowest_total_flight_price"] = round(sum(lowest), 2)
+        trip["currency"] = currencies.pop()
+    return dumps(trip)
 
 
 # --- Setup ---
-tools = [search_flights, search_hotels, get_weather, get_attractions, get_restaurants, get_events, create_itinerary]
+tools = [search_flights, get_flight_price_calendar, search_hotels, get_weather, get_weather_for_cities, get_attractions, get_restaurants, get_events, create_itinerary, plan_multi_city_trip]
 tools_map = {t.name: t for t in tools}
 
 model = ChatVertexAI(model_name="gemini-2.0-flash", temperature=0.3, max_output_tokens=4096)
 model_with_tools = model.bind_tools(tools)
+final_answer_model = model.bind_tools(tools, tool_choice="none")
 
 
-class AgentState(TypedDict):
+class AgentState(TypedDict, total=False):
     messages: Annotated[Sequence[BaseMessage], operator.add]
+    time_budget_s: float
+    tool_call_budget: int
+    deadline: float
+    tool_calls_remaining: int
+    budget_exhausted: Optional[str]
+
+
+def budget_exhausted_reason(state: AgentState) -> Optional[str]:
+    """Return why the turn budget ran out, or None while there is budget left."""
+    if state.get("budget_exhausted"):
+        return state["budget_exhausted"]
+    deadline = state.get("deadline")
+    if deadline is not None and time.monotonic() >= deadline:
+        return f"time budget of {state.get('time_budget_s', TURN_TIME_BUDGET_S):g}s exceeded"
+    if state.get("tool_calls_remaining", 1) <= 0:
+        return f"tool-call budget of {state.get('tool_call_budget', TURN_TOOL_CALL_BUDGET)} calls used up"
+    return None
 
 
 def should_continue(state: AgentState) -> str:
+    if state.get("budget_exhausted"):
+        return "end"
     last_message = state["messages"][-1]
     if not hasattr(last_message, "tool_calls") or not last_message.tool_calls:
         return "end"
@@ -252,19 +411,38 @@ def call_model(state: AgentState) -> dict:
     messages = state["messages"]
     if not messages or not isinstance(messages[0], SystemMessage):
         messages = [SystemMessage(content=SYSTEM_PROMPT)] + list(messages)
+
+    reason = budget_exhausted_reason(state)
+    if reason:
+        print(f"⏱️ Turn budget exhausted ({reason}), forcing final answer")
+        final = final_answer_model.invoke(list(messages) + [HumanMessage(content=BUDGET_EXHAUSTED_PROMPT)])
+        return {"messages": [final], "budget_exhausted": reason}
     return {"messages": [model_with_tools.invoke(messages)]}
 
 
 def call_tools(state: AgentState) -> dict:
     last_message = state["messages"][-1]
+    remaining = state.get("tool_calls_remaining", TURN_TOOL_CALL_BUDGET)
+    reason = None
     results = []
     for tc in last_message.tool_calls:
+        reason = reason or budget_exhausted_reason({**state, "tool_calls_remaining": remaining})
+        if reason:
+            # Every tool call still needs a response so the history stays valid for Gemini.
+            results.append(ToolMessage(tool_call_id=tc["id"], content=json.dumps({"error": f"Skipped: {reason}"})))
+            continue
+        remaining -= 1
         try:
-            result = tools_map[tc["name"]].invoke(tc["args"]) if tc["name"] in tools_map else '{"error": "Tool not found"}'
+            # Provider requests time out when the turn's deadline passes
+            with request_deadline(state.get("deadline")):
+                result = tools_map[tc["name"]].invoke(tc["args"]) if tc["name"] in tools_map else '{"error": "Tool not found"}'
         except Exception as e:
             result = json.dumps({"error": str(e)})
         results.append(ToolMessage(tool_call_id=tc["id"], content=str(result)))
-    return {"messages": results}
+    update = {"messages": results, "tool_calls_remaining": remaining}
+    if reason:
+        update["budget_exhausted"] = reason
+    return update
 
 
 # --- Build Graph ---
@@ -276,6 +454,58 @@ workflow.add_conditional_edges("agent", should_continue, {"continue": "tools", "
 workflow.add_edge("tools", "agent")
 app = workflow.compile()
 
+
+# --- Session History Compaction ---
+# Tool payloads are kept once in the shared blob store; session history holds
+# only a digest reference, expanded again when the graph runs.
+COMPACT_MIN_CHARS = 512
+
+def compact_history(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """Replace large ToolMessage contents with blob references."""
+    compacted = []
+    for msg in messages:
+        if isinstance(msg, ToolMessage) and isinstance(msg.content, str) and len(msg.content) >= COMPACT_MIN_CHARS and not parse_ref(msg.content):
+            digest = blob_store.put(msg.content)
+            msg = msg.model_copy(update={"content": make_ref(digest, msg.content)})
+        compacted.append(msg)
+    return compacted
+
+def expand_history(messages: Sequence[BaseMessage]) -> List[BaseMessage]:
+    """Load full payloads for blob references; a missing blob leaves its preview in place."""
+    expanded = []
+    for msg in messages:
+        digest = parse_ref(msg.content) if isinstance(msg, ToolMessage) else None
+        content = blob_store.get(digest) if digest else None
+        if content is not None:
+            msg = msg.model_copy(update={"content": content})
+        expanded.append(msg)
+    return expanded
+
+
+def run_turn(messages: Sequence[BaseMessage], time_budget_s: Optional[float] = None, tool_call_budget: Optional[int] = None) -> dict:
+    """Run the graph for one user turn within a wall-clock and tool-call budget.
+
+    `messages` may contain compacted tool results (see `compact_history`); they are expanded first.
+    """
+    time_budget_s = TURN_TIME_BUDGET_S if time_budget_s is None else time_budget_s
+    tool_call_budget = TURN_TOOL_CALL_BUDGET if tool_call_budget is None else tool_call_budget
+    state = {
+        "messages": expand_history(messages),
+        "time_budget_s": time_budget_s,
+        "tool_call_budget": tool_call_budget,
+        "deadline": time.monotonic() + time_budget_s,
+        "tool_calls_remaining": tool_call_budget,
+        "budget_exhausted": None,
+    }
+    # Each tool call needs at most one agent and one tools step, plus the forced final answer.
+    recursion_limit = 2 * tool_call_budget + 5
+    with turn_scope() as memo:
+        result = app.invoke(state, config={"recursion_limit": recursion_limit})
+    result["memo_stats"] = memo.stats()
+    if memo.hits:
+        print(f"♻️ Reused {memo.hits} duplicate API calls this turn (~{memo.seconds_saved:.1f}s saved)")
+    return result
+
 if __name__ == "__main__":
     print("🧞 TravelGenie LIVE Agent ready!")
     print(f"Tools: {list(tools_map.keys())}")
@@ -8,5 +8,7 @@ from .weather_client import WeatherClient
 from .places_client import PlacesClient
 from .events_client import EventsClient
 from .ticketmaster_client import TicketmasterClient
+from .models import FlightOffer, Hotel, Place, Event, DailyForecast, dumps
 
-__all__ = ['DuffelClient', 'BookingClient', 'WeatherClient', 'PlacesClient', 'EventsClient', 'TicketmasterClient', 'normalize_airport_code']
+__all__ = ['DuffelClient', 'BookingClient', 'WeatherClient', 'PlacesClient', 'EventsClient', 'TicketmasterClient', 'normalize_airport_code',
+           'FlightOffer', 'Hotel', 'Place', 'Event', 'DailyForecast', 'dumps']
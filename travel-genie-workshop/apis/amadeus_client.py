@@ -5,22 +5,44 @@ https://developers.amadeus.com/
 
 import os
 import json
+import threading
+import contextvars
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import replace
 from datetime import datetime
-from typing import Optional
+from typing import List, Optional
 import requests
 
+from .cache import cached
+from .http import RevalidatingSession
+from .memo import memoize
+from .models import FlightOffer, Hotel
+from .ranking import rank_offers
+
 
 class AmadeusClient:
     """Client for Amadeus Self-Service APIs."""
     
     BASE_URL = "https://test.api.amadeus.com/v1"
     BASE_URL_V2 = "https://test.api.amadeus.com/v2"
+    BASE_URL_V3 = "https://test.api.amadeus.com/v3"
+    FLIGHTS_TTL_S = 10 * 60
+    HOTELS_TTL_S = 30 * 60  # priced results; never served stale, and partially priced ones are not cached at all
+    HOTEL_LIST_TTL_S = 24 * 3600  # reference data changes rarely; served stale and revalidated after a day
+    HOTEL_LIST_STALE_TTL_S = 7 * 24 * 3600
+    MAX_FLIGHT_OFFERS = 250  # API maximum; all offers are ranked locally
+    HOTEL_OFFERS_CHUNK_SIZE = 20  # hotelIds per hotel-offers request
+    MAX_PRICED_HOTELS = 60
+    HOTEL_OFFERS_TIMEOUT_S = 10
+    HOTEL_OFFERS_WORKERS = 4
     
     def __init__(self):
         self.api_key = os.getenv("AMADEUS_API_KEY")
         self.api_secret = os.getenv("AMADEUS_API_SECRET")
         self.access_token = None
         self.token_expires = None
+        self._token_lock = threading.Lock()
+        self.session = RevalidatingSession()
         
         if not self.api_key or not self.api_secret:
             raise ValueError(
@@ -29,69 +51,57 @@ class AmadeusClient:
             )
     
     def _get_access_token(self) -> str:
-        """Get OAuth2 access token from Amadeus."""
-        if self.access_token and self.token_expires:
-            if datetime.now().timestamp() < self.token_expires:
-                return self.access_token
-        
-        url = f"{self.BASE_URL}/security/oauth2/token"
-        data = {
-            "grant_type": "client_credentials",
-            "client_id": self.api_key,
-            "client_secret": self.api_secret
-        }
-        
-        response = requests.post(url, data=data)
-        
-        if response.status_code != 200:
-            raise Exception(f"Failed to get Amadeus token: {response.text}")
-        
-        token_data = response.json()
-        self.access_token = token_data["access_token"]
-        self.token_expires = datetime.now().timestamp() + token_data["expires_in"] - 60
-        
-        return self.access_token
+        """Get OAuth2 access token from Amadeus (one refresh at a time across threads)."""
+        with self._token_lock:
+            if self.access_token and self.token_expires:
+                if datetime.now().timestamp() < self.token_expires:
+                    return self.access_token
+            
+            url = f"{self.BASE_URL}/security/oauth2/token"
+            data = {
+                "grant_type": "client_credentials",
+                "client_id": self.api_key,
+                "client_secret": self.api_secret
+            }
+            
+            response = self.session.post(url, data=data)
+            
+            if response.status_code != 200:
+                raise Exception(f"Failed to get Amadeus token: {response.text}")
+            
+            token_data = response.json()
+            self.access_token = token_data["access_token"]
+            self.token_expires = datetime.now().timestamp() + token_data["expires_in"] - 60
+            
+            return self.access_token
     
-    def _make_request(self, endpoint: str, params: dict, version: str = "v1") -> dict:
+    def _make_request(self, endpoint: str, params: dict, version: str = "v1", timeout: Optional[float] = None) -> dict:
         """Make authenticated request to Amadeus API."""
         token = self._get_access_token()
-        base = self.BASE_URL if version == "v1" else self.BASE_URL_V2
+        base = {"v1": self.BASE_URL, "v2": self.BASE_URL_V2, "v3": self.BASE_URL_V3}[version]
         url = f"{base}/{endpoint}"
         headers = {"Authorization": f"Bearer {token}"}
         
-        response = requests.get(url, headers=headers, params=params)
+        try:
+            response = self.session.get(url, headers=headers, params=params, timeout=timeout)
+        except requests.exceptions.Timeout:
+            return {"error": f"Request to {endpoint} timed out", "status_code": 408}
         
         if response.status_code == 200:
             return response.json()
         else:
             return {"error": response.text, "status_code": response.status_code}
     
-    def search_flights(
-        self,
-        origin: str,
-        destination: str,
-        departure_date: str,
-        return_date: Optional[str] = None,
-        adults: int = 1,
-        max_results: int = 5
-    ) -> dict:
-        """
-        Search for flight offers.
-        
-        Args:
-            origin: Origin airport IATA code (e.g., "JFK", "LAX")
-            destination: Destination airport IATA code
-            departure_date: Date in YYYY-MM-DD format
-            return_date: Optional return date for round-trip
-            adults: Number of adult passengers
-            max_results: Maximum number of results to return
-        """
+    @memoize
+    @cached(ttl=FLIGHTS_TTL_S, stale_ttl=0)
+    def fetch_offers(self, origin: str, destination: str, departure_date: str, return_date: Optional[str] = None, adults: int = 1) -> dict:
+        """Every offer for a route and dates as FlightOffer records. Cached without ranking, so all callers share one search."""
         params = {
             "originLocationCode": origin.upper()[:3],
             "destinationLocationCode": destination.upper()[:3],
             "departureDate": departure_date,
             "adults": adults,
-            "max": max_results,
+            "max": self.MAX_FLIGHT_OFFERS,
             "currencyCode": "USD"
         }
         
@@ -115,82 +125,182 @@ class AmadeusClient:
                     first_segment = segments[0]
                     last_segment = segments[-1]
                     
-                    flight = {
-                        "offer_id": offer.get("id"),
-                        "airline": first_segment.get("carrierCode"),
-                        "flight_number": f"{first_segment.get('carrierCode')}{first_segment.get('number')}",
-                        "origin": first_segment.get("departure", {}).get("iataCode"),
-                        "destination": last_segment.get("arrival", {}).get("iataCode"),
-                        "departure_time": first_segment.get("departure", {}).get("at"),
-                        "arrival_time": last_segment.get("arrival", {}).get("at"),
-                        "duration": outbound.get("duration"),
-                        "stops": len(segments) - 1,
-                        "price": price_info.get("grandTotal"),
-                        "currency": price_info.get("currency", "USD"),
-                        "seats_available": offer.get("numberOfBookableSeats"),
-                        "cabin_class": segments[0].get("cabin", "ECONOMY")
-                    }
+                    flight = FlightOffer(
+                        offer_id=offer.get("id"),
+                        airline=first_segment.get("carrierCode"),
+                        flight_number=f"{first_segment.get('carrierCode')}{first_segment.get('number')}",
+                        origin=first_segment.get("departure", {}).get("iataCode"),
+                        destination=last_segment.get("arrival", {}).get("iataCode"),
+                        departure_time=first_segment.get("departure", {}).get("at"),
+                        arrival_time=last_segment.get("arrival", {}).get("at"),
+                        duration=outbound.get("duration"),
+                        stops=len(segments) - 1,
+                        price=price_info.get("grandTotal"),
+                        currency=price_info.get("currency", "USD"),
+                        seats_available=offer.get("numberOfBookableSeats"),
+                        cabin_class=segments[0].get("cabin", "ECONOMY")
+                    )
                     flights.append(flight)
             except Exception:
                 continue
         
+        return {"offers": flights}
+    
+    def search_flights(
+        self,
+        origin: str,
+        destination: str,
+        departure_date: str,
+        return_date: Optional[str] = None,
+        adults: int = 1,
+        max_results: int = 5,
+        preference: str = "balanced"
+    ) -> dict:
+        """
+        Search for flight offers.
+        
+        Args:
+            origin: Origin airport IATA code (e.g., "JFK", "LAX")
+            destination: Destination airport IATA code
+            departure_date: Date in YYYY-MM-DD format
+            return_date: Optional return date for round-trip
+            adults: Number of adult passengers
+            max_results: Maximum number of results to return
+            preference: Ranking preference - "cheapest", "fastest" or "balanced"
+        """
+        result = self.fetch_offers(origin.upper()[:3], destination.upper()[:3], departure_date, return_date, adults)
+        
+        if "error" in result:
+            return result
+        
+        ranked = rank_offers(result["offers"], preference=preference, top_k=max_results)
         return {
             "origin": origin.upper(),
             "destination": destination.upper(),
             "departure_date": departure_date,
             "return_date": return_date,
             "passengers": adults,
-            "flights_found": len(flights),
-            "flights": flights
+            "ranking": preference,
+            "offers_considered": ranked["offers_considered"],
+            "pareto_optimal": ranked["pareto_optimal"],
+            "lowest_price": ranked["lowest_price"],
+            "flights_found": len(ranked["flights"]),
+            "flights": ranked["flights"]
         }
     
+    @memoize
+    @cached(ttl=HOTEL_LIST_TTL_S, stale_ttl=HOTEL_LIST_STALE_TTL_S)
+    def get_hotels_by_city(self, city_code: str) -> dict:
+        """Raw hotel reference list for a city, shared by every search_hotels stay in that city."""
+        params = {
+            "cityCode": city_code.upper()[:3],
+            "radius": 20,
+            "radiusUnit": "KM",
+            "hotelSource": "ALL"
+        }
+        return self._make_request("reference-data/locations/hotels/by-city", params, version="v1")
+    
+    @memoize
+    @cached(ttl=HOTELS_TTL_S, stale_ttl=0, cacheable=lambda result: not result.get("pricing_partial"))
     def search_hotels(
         self,
         city_code: str,
         check_in_date: str,
         check_out_date: str,
         adults: int = 2,
-        max_results: int = 10
+        max_results: int = 10,
+        with_prices: bool = True
     ) -> dict:
-        """Search for hotels by city."""
-        params = {
-            "cityCode": city_code.upper()[:3],
-            "radius": 20,
-            "radiusUnit": "KM",
-            "hotelSource": "ALL"
-        }
-        
-        hotels_result = self._make_request("reference-data/locations/hotels/by-city", params, version="v1")
+        """Search for hotels by city, optionally priced for the stay via batched hotel-offers requests."""
+        hotels_result = self.get_hotels_by_city(city_code)
         
         if "error" in hotels_result:
             return hotels_result
         
-        hotel_list = hotels_result.get("data", [])[:max_results]
+        # Price a larger pool than we return, since many hotels have no availability
+        pool_size = max(max_results, self.MAX_PRICED_HOTELS) if with_prices else max_results
+        hotel_list = hotels_result.get("data", [])[:pool_size]
         
         hotels = []
         for hotel in hotel_list:
             try:
-                hotels.append({
-                    "hotel_id": hotel.get("hotelId"),
-                    "name": hotel.get("name"),
-                    "city": city_code.upper(),
-                    "address": hotel.get("address", {}).get("lines", [""])[0] if hotel.get("address") else "",
-                    "latitude": hotel.get("geoCode", {}).get("latitude"),
-                    "longitude": hotel.get("geoCode", {}).get("longitude"),
-                    "distance_km": hotel.get("distance", {}).get("value"),
-                    "check_in": check_in_date,
-                    "check_out": check_out_date
-                })
+                hotels.append(Hotel(
+                    hotel_id=hotel.get("hotelId"),
+                    name=hotel.get("name"),
+                    city=city_code.upper(),
+                    address=hotel.get("address", {}).get("lines", [""])[0] if hotel.get("address") else "",
+                    latitude=hotel.get("geoCode", {}).get("latitude"),
+                    longitude=hotel.get("geoCode", {}).get("longitude"),
+                    distance_km=hotel.get("distance", {}).get("value"),
+                    check_in=check_in_date,
+                    check_out=check_out_date
+                ))
             except Exception:
                 continue
         
+        pricing = {}
+        if with_prices and hotels:
+            prices, pricing = self._price_hotels([h.hotel_id for h in hotels if h.hotel_id], check_in_date, check_out_date, adults)
+            priced = [replace(h, price=prices[h.hotel_id][0], currency=prices[h.hotel_id][1]) for h in hotels if h.hotel_id in prices]
+            unpriced = [h for h in hotels if h.hotel_id not in prices]
+            hotels = sorted(priced, key=lambda h: float(h.price)) + unpriced
+        hotels = hotels[:max_results]
+        
         return {
             "city": city_code.upper(),
             "check_in": check_in_date,
             "check_out": check_out_date,
             "hotels_found": len(hotels),
-            "hotels": hotels
+            "hotels": hotels,
+            **pricing
+        }
+    
+    def _fetch_offer_chunk(self, hotel_ids: List[str], check_in_date: str, check_out_date: str, adults: int) -> dict:
+        params = {
+            "hotelIds": ",".join(hotel_ids),
+            "adults": adults,
+            "checkInDate": check_in_date,
+            "checkOutDate": check_out_date,
+            "currency": "USD",
+            "bestRateOnly": "true"
         }
+        return self._make_request("shopping/hotel-offers", params, version="v3", timeout=self.HOTEL_OFFERS_TIMEOUT_S)
+    
+    def _price_hotels(self, hotel_ids: List[str], check_in_date: str, check_out_date: str, adults: int) -> tuple:
+        """Fetch the best rate per hotel, chunked and concurrent.
+        
+        Returns ({hotel_id: (total, currency)}, pricing summary). Chunks that fail or
+        miss the deadline are reported in the summary instead of failing the search.
+        """
+        size = self.HOTEL_OFFERS_CHUNK_SIZE
+        chunks = [hotel_ids[i:i + size] for i in range(0, len(hotel_ids), size)]
+        
+        executor = ThreadPoolExecutor(max_workers=self.HOTEL_OFFERS_WORKERS)
+        futures = [executor.submit(contextvars.copy_context().run, self._fetch_offer_chunk, chunk, check_in_date, check_out_date, adults) for chunk in chunks]
+        done, not_done = wait(futures, timeout=self.HOTEL_OFFERS_TIMEOUT_S + 2)
+        executor.shutdown(wait=False, cancel_futures=True)
+        
+        prices = {}
+        failed = len(not_done)
+        for future in done:
+            result = future.result() if not future.exception() else {"error": str(future.exception())}
+            if "error" in result:
+                failed += 1
+                continue
+            for entry in result.get("data", []):
+                offers = entry.get("offers") or []
+                hotel_id = entry.get("hotel", {}).get("hotelId")
+                if not entry.get("available", True) or not offers or not hotel_id:
+                    continue
+                price = offers[0].get("price", {})
+                if price.get("total") is not None:
+                    prices[hotel_id] = (price["total"], price.get("currency", "USD"))
+        
+        summary = {"priced_hotels": len(prices), "pricing_chunks": len(chunks)}
+        if failed:
+            summary["pricing_chunks_failed"] = failed
+            summary["pricing_partial"] = True
+        return prices, summary
 
 
 # City code mappings for convenience
@@ -0,0 +1,181 @@
+"""
+Content-addressed store for large tool payloads.
+
+Tool results are multi-KB JSON strings that many sessions share (the same
+Paris forecast, the same Tokyo attractions). Each payload is stored once under
+its SHA-256 digest: recent blobs stay in a process-wide in-memory LRU bounded
+by bytes, and every blob is also written to disk so it can be reloaded after
+eviction or a restart. The disk tier has its own byte cap and evicts the least
+recently used files, since on Cloud Run the local filesystem is held in memory.
+Session history keeps only the digest and a short preview (see `make_ref`).
+"""
+
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from typing import Optional
+
+DEFAULT_DIR = os.path.join(os.path.expanduser("~"), ".cache", "travelgenie", "blobs")
+DEFAULT_MEMORY_BYTES = 32 * 1024 * 1024
+DEFAULT_DISK_BYTES = 256 * 1024 * 1024
+
+REF_PREFIX = "blob:sha256:"
+PREVIEW_CHARS = 160
+
+
+def digest_of(content: str) -> str:
+    return hashlib.sha256(content.encode("utf-8")).hexdigest()
+
+
+def make_ref(digest: str, content: str) -> str:
+    """Compact stand-in for a payload: the digest plus a one-line preview."""
+    preview = " ".join(content[:PREVIEW_CHARS].split())
+    return f"{REF_PREFIX}{digest} {preview}…"
+
+
+def parse_ref(text: str) -> Optional[str]:
+    """Digest from a reference produced by `make_ref`, or None for ordinary content."""
+    if not isinstance(text, str) or not text.startswith(REF_PREFIX):
+        return None
+    digest = text[len(REF_PREFIX):len(REF_PREFIX) + 64]
+    return digest if len(digest) == 64 else None
+
+
+class BlobStore:
+    """Thread-safe digest -> text store: a byte-bounded memory LRU over a byte-bounded LRU directory of files."""
+
+    def __init__(self, directory: Optional[str] = None, max_memory_bytes: Optional[int] = None, max_disk_bytes: Optional[int] = None):
+        self.directory = directory or os.getenv("BLOB_STORE_DIR", DEFAULT_DIR)
+        self.max_memory_bytes = max_memory_bytes or int(os.getenv("BLOB_STORE_MEMORY_BYTES", DEFAULT_MEMORY_BYTES))
+        self.max_disk_bytes = max_disk_bytes or int(os.getenv("BLOB_STORE_DISK_BYTES", DEFAULT_DISK_BYTES))
+        self._lock = threading.Lock()
+        self._memory: "OrderedDict[str, tuple]" = OrderedDict()  # digest -> (content, utf-8 size)
+        self._memory_bytes = 0
+        self._disk = self._scan_disk()  # digest -> file size, least recently used first
+        self._disk_bytes = sum(self._disk.values())
+        self.hits = 0
+        self.disk_reads = 0
+        self.misses = 0
+
+    def _path(self, digest: str) -> str:
+        return os.path.join(self.directory, digest[:2], digest[2:])
+
+    def _scan_disk(self) -> "OrderedDict[str, int]":
+        """Index blobs left by earlier processes, oldest access (mtime) first."""
+        found = []
+        try:
+            for prefix in os.listdir(self.directory):
+                folder = os.path.join(self.directory, prefix)
+                if len(prefix) != 2 or not os.path.isdir(folder):
+                    continue
+                for name in os.listdir(folder):
+                    if name.endswith(".tmp"):
+                        continue
+                    stat = os.stat(os.path.join(folder, name))
+                    found.append((stat.st_mtime, prefix + name, stat.st_size))
+        except OSError:
+            pass
+        return OrderedDict((digest, size) for _, digest, size in sorted(found))
+
+    def _remember(self, digest: str, content: str, size: int) -> None:
+        """Insert into the memory tier and evict least recently used blobs. Caller holds the lock."""
+        if digest in self._memory:
+            self._memory.move_to_end(digest)
+            return
+        if size > self.max_memory_bytes:
+            return
+        self._memory[digest] = (content, size)
+        self._memory_bytes += size
+        while self._memory_bytes > self.max_memory_bytes:
+            _, (_, evicted_size) = self._memory.popitem(last=False)
+            self._memory_bytes -= evicted_size
+
+    def _write(self, digest: str, content: str, size: int) -> None:
+        """Persist a blob and evict least recently used files past the disk cap."""
+        with self._lock:
+            if digest in self._disk or size > self.max_disk_bytes:
+                return
+        path = self._path(digest)
+        try:
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                f.write(content)
+            os.replace(tmp_path, path)
+        except OSError as e:
+            print(f"🗄️ Could not persist blob {digest[:12]}: {e}")
+            return
+        evicted = []
+        with self._lock:
+            if digest not in self._disk:
+                self._disk[digest] = size
+                self._disk_bytes += size
+            while self._disk_bytes > self.max_disk_bytes:
+                old, old_size = self._disk.popitem(last=False)
+                self._disk_bytes -= old_size
+                evicted.append(old)
+        for old in evicted:
+            try:
+                os.remove(self._path(old))
+            except OSError:
+                pass
+
+    def _touch(self, digest: str) -> None:
+        """Mark a disk blob as recently used, in the index and (for later processes) its mtime."""
+        with self._lock:
+            if digest in self._disk:
+                self._disk.move_to_end(digest)
+        try:
+            os.utime(self._path(digest))
+        except OSError:
+            pass
+
+    def put(self, content: str) -> str:
+        """Store a payload (idempotent) and return its digest."""
+        digest = digest_of(content)
+        size = len(content.encode("utf-8"))
+        with self._lock:
+            self._remember(digest, content, size)
+            on_disk = digest in self._disk
+        if on_disk:
+            self._touch(digest)
+        else:
+            self._write(digest, content, size)
+        return digest
+
+    def get(self, digest: str) -> Optional[str]:
+        with self._lock:
+            entry = self._memory.get(digest)
+            if entry is not None:
+                self._memory.move_to_end(digest)
+                self.hits += 1
+                return entry[0]
+        try:
+            with open(self._path(digest), encoding="utf-8") as f:
+                content = f.read()
+        except OSError:
+            with self._lock:
+                self.misses += 1
+            return None
+        with self._lock:
+            self.disk_reads += 1
+            self._remember(digest, content, len(content.encode("utf-8")))
+        self._touch(digest)
+        return content
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {
+                "blobs_in_memory": len(self._memory),
+                "memory_bytes": self._memory_bytes,
+                "blobs_on_disk": len(self._disk),
+                "disk_bytes": self._disk_bytes,
+                "hits": self.hits,
+                "disk_reads": self.disk_reads,
+                "misses": self.misses,
+            }
+
+
+# Shared by every session in the process
+blob_store = BlobStore()
@@ -0,0 +1,198 @@
+"""
+Shared TTL response cache for API client calls.
+
+Unlike the per-turn memo, this cache lives for the whole process and is shared
+by every session, so background work (prefetching, warming) can fill it ahead
+of the user's next request.
+"""
+
+import functools
+import inspect
+import threading
+import time
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import Any, Callable, Optional, Tuple
+
+from .memo import call_key, is_error
+
+FRESH, STALE, MISS = "fresh", "stale", "miss"
+
+
+class ResponseCache:
+    """Thread-safe LRU cache with per-entry expiry, single-flight loading and
+    stale-while-revalidate: an entry past its TTL but within its stale window is
+    returned immediately while a background refresh replaces it.
+    """
+
+    def __init__(self, max_entries: int = 2048, refresh_workers: int = 2):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._inflight = {}
+        self._lock = threading.Lock()
+        self._refresher = ThreadPoolExecutor(max_workers=refresh_workers, thread_name_prefix="cache-refresh")
+        self.hits = 0
+        self.stale_hits = 0
+        self.misses = 0
+
+    def _lookup(self, key: Any) -> Tuple[str, Any]:
+        """Return ("fresh" | "stale" | "miss", value). Caller holds the lock."""
+        entry = self._entries.get(key)
+        if entry is None:
+            return MISS, None
+        value, fresh_until, stale_until = entry
+        now = time.monotonic()
+        if now < fresh_until:
+            return FRESH, value
+        if now < stale_until:
+            return STALE, value
+        del self._entries[key]
+        return MISS, None
+
+    def get(self, key: Any) -> Tuple[bool, Any]:
+        """Return (found, value) for a fresh entry only."""
+        with self._lock:
+            state, value = self._lookup(key)
+            if state != FRESH:
+                return False, None
+            self._entries.move_to_end(key)
+            return True, value
+
+    def set(self, key: Any, value: Any, ttl: float, stale_ttl: float = 0) -> None:
+        now = time.monotonic()
+        with self._lock:
+            self._entries[key] = (value, now + ttl, now + ttl + stale_ttl)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def contains(self, key: Any) -> bool:
+        with self._lock:
+            return self._lookup(key)[0] == FRESH
+
+    def expires_in(self, key: Any) -> Optional[float]:
+        """Seconds until the entry stops being fresh (negative once stale), or None if absent."""
+        with self._lock:
+            state, _ = self._lookup(key)
+            if state == MISS:
+                return None
+            return self._entries[key][1] - time.monotonic()
+
+    def get_or_load(self, key: Any, loader: Callable[[], Any], ttl: float, stale_ttl: float = 0,
+                    cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Return the cached value or call `loader` once, even if several threads ask at the same time.
+
+        A stale value is returned as-is and refreshed in the background. Loaded
+        values are stored only if `cacheable(value)` holds (default: not an error).
+        """
+        with self._lock:
+            state, value = self._lookup(key)
+            if state != MISS:
+                self._entries.move_to_end(key)
+            if state == FRESH:
+                self.hits += 1
+                return value
+            if state == STALE:
+                self.stale_hits += 1
+            else:
+                self.misses += 1
+
+        if state == STALE:
+            self.refresh_in_background(key, loader, ttl, stale_ttl, cacheable)
+            return value
+        return self._load(key, loader, ttl, stale_ttl, True, cacheable)
+
+    def refresh(self, key: Any, loader: Callable[[], Any], ttl: float, stale_ttl: float = 0,
+                cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        """Reload an entry now, regardless of its age. Concurrent refreshes of one key are coalesced."""
+        return self._load(key, loader, ttl, stale_ttl, True, cacheable)
+
+    def refresh_in_background(self, key: Any, loader: Callable[[], Any], ttl: float, stale_ttl: float = 0,
+                              cacheable: Optional[Callable[[Any], bool]] = None) -> None:
+        with self._lock:
+            if key in self._inflight:
+                return
+        self._refresher.submit(self._load, key, loader, ttl, stale_ttl, False, cacheable)
+
+    def _load(self, key: Any, loader: Callable[[], Any], ttl: float, stale_ttl: float, wait: bool,
+              cacheable: Optional[Callable[[Any], bool]] = None) -> Any:
+        with self._lock:
+            event = self._inflight.get(key)
+            owner = event is None
+            if owner:
+                event = self._inflight[key] = threading.Event()
+
+        if not owner:
+            if not wait:
+                return None
+            event.wait()
+            with self._lock:
+                state, value = self._lookup(key)
+            return value if state != MISS else loader()
+
+        try:
+            value = loader()
+            if not is_error(value) and (cacheable is None or cacheable(value)):
+                self.set(key, value, ttl, stale_ttl)
+            return value
+        except Exception as e:
+            if wait:
+                raise
+            print(f"♻️ Background refresh failed: {e}")
+            return None
+        finally:
+            with self._lock:
+                self._inflight.pop(key, None)
+            event.set()
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "stale_hits": self.stale_hits, "misses": self.misses}
+
+
+response_cache = ResponseCache()
+
+
+def cached(ttl: float, stale_ttl: Optional[float] = None, cacheable: Optional[Callable[[Any], bool]] = None) -> Callable:
+    """Cache a client method's successful results in the shared response cache.
+
+    Entries are fresh for `ttl` seconds and may then be served stale for another
+    `stale_ttl` seconds (default: `ttl`) while they are refreshed in the background.
+    Results for which `cacheable(result)` is false are returned but not stored.
+    """
+    stale_ttl = ttl if stale_ttl is None else stale_ttl
+
+    def decorator(func: Callable) -> Callable:
+        signature = inspect.signature(func)
+
+        @functools.wraps(func)
+        def wrapper(*args, **kwargs):
+            key = call_key(func, signature, args, kwargs)
+            return response_cache.get_or_load(key, lambda: func(*args, **kwargs), ttl, stale_ttl, cacheable)
+
+        def refresh(*args, **kwargs):
+            key = call_key(func, signature, args, kwargs)
+            return response_cache.refresh(key, lambda: func(*args, **kwargs), ttl, stale_ttl, cacheable)
+
+        wrapper.cache_key = lambda *args, **kwargs: call_key(func, signature, args, kwargs)
+        wrapper.refresh = refresh
+        return wrapper
+
+    return decorator
+
+
+def is_cached(method: Callable, *args, **kwargs) -> bool:
+    """Whether a bound @cached client method already has a fresh result for these arguments."""
+    key = method.cache_key(method.__self__, *args, **kwargs)
+    return response_cache.contains(key)
+
+
+def expires_in(method: Callable, *args, **kwargs) -> Optional[float]:
+    """Seconds until a bound @cached method's entry for these arguments goes stale, or None if not cached."""
+    key = method.cache_key(method.__self__, *args, **kwargs)
+    return response_cache.expires_in(key)
+
+
+def refresh(method: Callable, *args, **kwargs) -> Any:
+    """Bypass the cache and reload a bound @cached method's entry for these arguments."""
+    return method.refresh(method.__self__, *args, **kwargs)
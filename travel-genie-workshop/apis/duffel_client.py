@@ -5,19 +5,32 @@ https://duffel.com/docs/api
 
 import os
 import json
-import requests
 from typing import Optional, List
 
+from .cache import cached
+from .http import RevalidatingSession
+from .memo import memoize
+from .models import FlightOffer
+from .ranking import rank_offers
+
 
 class DuffelClient:
     """Client for Duffel Flight APIs."""
     
     BASE_URL = "https://api.duffel.com/air"
+    FLIGHTS_TTL_S = 10 * 60
     
     def __init__(self):
         self.api_key = os.getenv("DUFFEL_API_KEY")
         if not self.api_key:
             raise ValueError("DUFFEL_API_KEY environment variable required.")
+        self.session = RevalidatingSession()
+    
+    def probe(self, timeout: float) -> dict:
+        """Health probe: a one-record airline lookup."""
+        headers = {"Authorization": f"Bearer {self.api_key}", "Duffel-Version": "v2", "Accept": "application/json"}
+        response = self.session.get(f"{self.BASE_URL}/airlines", headers=headers, params={"limit": 1}, timeout=timeout)
+        return {"ok": True} if response.status_code == 200 else {"error": f"Duffel probe failed ({response.status_code})"}
 
     def _make_request(self, method: str, endpoint: str, data: Optional[dict] = None) -> dict:
         url = f"{self.BASE_URL}/{endpoint}"
@@ -28,10 +41,13 @@ class DuffelClient:
             "Accept": "application/json",
             "Accept-Encoding": "gzip"
         }
-        response = requests.request(method, url, headers=headers, json=data)
+        response = self.session.request(method, url, headers=headers, json=data)
         return response.json() if response.status_code in [200, 201] else {"error": response.text}
 
-    def search_flights(self, origin: str, destination: str, departure_date: str, return_date: Optional[str] = None, adults: int = 1) -> dict:
+    @memoize
+    @cached(ttl=FLIGHTS_TTL_S, stale_ttl=0)
+    def fetch_offers(self, origin: str, destination: str, departure_date: str, return_date: Optional[str] = None, adults: int = 1) -> dict:
+        """Every offer for a route and dates as FlightOffer records. Cached without ranking, so all callers share one search."""
         slices = [{"origin": origin.upper(), "destination": destination.upper(), "departure_date": departure_date}]
         if return_date:
             slices.append({"origin": destination.upper(), "destination": origin.upper(), "departure_date": return_date})
@@ -41,23 +57,35 @@ class DuffelClient:
         
         if "error" in result: return result
         
-        offers = result.get("data", {}).get("offers", [])[:5]
+        offers = result.get("data", {}).get("offers", [])
         flights = []
         for offer in offers:
             try:
                 outbound = offer.get("slices", [])[0]
                 segments = outbound.get("segments", [])
-                flights.append({
-                    "airline": segments[0].get("operating_carrier", {}).get("iata_code"),
-                    "flight_number": f"{segments[0].get('operating_carrier_flight_number')}",
-                    "departure_time": segments[0].get("departing_at"),
-                    "arrival_time": segments[-1].get("arriving_at"),
-                    "price": offer.get("total_amount"),
-                    "currency": offer.get("total_currency")
-                })
+                flights.append(FlightOffer(
+                    airline=segments[0].get("operating_carrier", {}).get("iata_code"),
+                    flight_number=f"{segments[0].get('operating_carrier_flight_number')}",
+                    origin=segments[0].get("origin", {}).get("iata_code"),
+                    destination=segments[-1].get("destination", {}).get("iata_code"),
+                    departure_time=segments[0].get("departing_at"),
+                    arrival_time=segments[-1].get("arriving_at"),
+                    duration=outbound.get("duration"),
+                    stops=len(segments) - 1,
+                    price=offer.get("total_amount"),
+                    currency=offer.get("total_currency")
+                ))
             except Exception: continue
-                
-        return {"flights": flights, "flights_found": len(flights)}
+        
+        return {"offers": flights}
+
+    def search_flights(self, origin: str, destination: str, departure_date: str, return_date: Optional[str] = None, adults: int = 1, preference: str = "balanced", max_results: int = 5) -> dict:
+        """Search flights and return the top offers for `preference` ("cheapest", "fastest" or "balanced")."""
+        result = self.fetch_offers(origin.upper(), destination.upper(), departure_date, return_date, adults)
+        if "error" in result: return result
+        
+        ranked = rank_offers(result["offers"], preference=preference, top_k=max_results)
+        return {**ranked, "flights_found": len(ranked["flights"]), "ranking": preference}
 
 CITY_TO_AIRPORT = {
     "new york": "JFK", "nyc": "JFK", "los angeles": "LAX", "la": "LAX",
@@ -0,0 +1,145 @@
+"""
+Merged event feed across SerpAPI (Google Events) and Ticketmaster.
+
+Both providers are queried concurrently and already return Event records.
+Cross-provider duplicates are found by blocking on (date, title token) keys,
+so only events on the same date sharing a token are compared (undated listings
+are compared with dated ones sharing a token), then confirmed with a fuzzy
+title match and a compatible venue. The result is one date-sorted feed.
+"""
+
+import contextvars
+import re
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import fields, replace
+from difflib import SequenceMatcher
+from typing import List, Optional
+
+from .models import Event
+from .pagination import date_window
+
+_STOPWORDS = {"the", "a", "an", "and", "of", "at", "in", "on", "live", "tour", "presents", "with", "vs", "concert", "show"}
+_TOKEN = re.compile(r"[a-z0-9]+")
+
+TITLE_SIMILARITY = 0.6
+VENUE_SIMILARITY = 0.5
+
+
+def _tokens(text: Optional[str]) -> List[str]:
+    return [t for t in _TOKEN.findall((text or "").lower()) if t not in _STOPWORDS]
+
+
+def _similar(a: str, b: str) -> float:
+    return SequenceMatcher(None, a, b).ratio()
+
+
+def _blocking_keys(event: Event, tokens: List[str]) -> tuple:
+    """Cheap (lookup keys, insert keys) from the first three significant title tokens.
+
+    A dated event is filed under (date, token) and also under ("dated", token),
+    where undated events look it up; undated events are filed under
+    ("undated", token), where dated events look them up. So a listing without a
+    date still meets its dated duplicate, while dated events are only compared
+    with events on the same date.
+    """
+    tokens = tokens[:3] or [""]
+    undated = {hash(("undated", t)) for t in tokens}
+    any_dated = {hash(("dated", t)) for t in tokens}
+    if not event.date:
+        return undated | any_dated, undated
+    same_date = {hash((event.date, t)) for t in tokens}
+    return same_date | undated, same_date | any_dated
+
+
+def _same_event(a: Event, a_title: str, b: Event, b_title: str) -> bool:
+    if a.date and b.date and a.date != b.date:
+        return False
+    if _similar(a_title, b_title) < TITLE_SIMILARITY and not (a_title in b_title or b_title in a_title):
+        return False
+    if a.venue and b.venue:
+        venue_a, venue_b = " ".join(_tokens(a.venue)), " ".join(_tokens(b.venue))
+        return venue_a in venue_b or venue_b in venue_a or _similar(venue_a, venue_b) >= VENUE_SIMILARITY
+    return True
+
+
+def _merge(primary: Event, other: Event) -> Event:
+    """Fill the primary record's missing fields from the duplicate and record both sources."""
+    updates = {f.name: getattr(other, f.name) for f in fields(Event) if getattr(primary, f.name) in (None, [], "") and getattr(other, f.name) not in (None, [], "")}
+    sources = sorted(set(filter(None, f"{primary.source or ''}+{other.source or ''}".split("+"))))
+    updates["source"] = "+".join(sources)
+    return replace(primary, **updates)
+
+
+def dedupe_events(events: List[Event]) -> tuple:
+    """Collapse cross-provider duplicates. Returns (unique events, number merged)."""
+    blocks = {}
+    unique: List[Event] = []
+    titles: List[str] = []
+    merged = 0
+    for event in events:
+        tokens = _tokens(event.title)
+        title = " ".join(tokens)
+        lookup_keys, insert_keys = _blocking_keys(event, tokens)
+        candidates = {i for key in lookup_keys for i in blocks.get(key, ())}
+        match = next((i for i in sorted(candidates) if unique[i].source != event.source and _same_event(unique[i], titles[i], event, title)), None)
+        if match is not None:
+            unique[match] = _merge(unique[match], event)
+            merged += 1
+            continue
+        for key in insert_keys:
+            blocks.setdefault(key, []).append(len(unique))
+        unique.append(event)
+        titles.append(title)
+    return unique, merged
+
+
+class EventAggregator:
+    """Concurrent, deduplicated event search over whichever providers are configured."""
+
+    def __init__(self, events_client=None, ticketmaster_client=None, max_per_provider: int = 10):
+        self.events_client = events_client
+        self.ticketmaster_client = ticketmaster_client
+        self.max_per_provider = max_per_provider
+
+    def get_events(self, location: str, query: Optional[str] = None, date_filter: str = "week") -> dict:
+        start, end = date_window(date_filter)
+        searches = {}
+        if self.events_client:
+            searches["serpapi"] = lambda: self.events_client.get_events(location, query=query, date_filter=date_filter, max_results=self.max_per_provider)
+        if self.ticketmaster_client:
+            city = location.split(",")[0].strip()
+            searches["ticketmaster"] = lambda: self.ticketmaster_client.search_events(
+                city=city, keyword=query, max_results=self.max_per_provider,
+                start_date=start.isoformat() if start else None, end_date=end.isoformat() if end else None)
+        if not searches:
+            return {"error": "No events API configured."}
+
+        with ThreadPoolExecutor(max_workers=len(searches)) as executor:
+            futures = {name: executor.submit(contextvars.copy_context().run, search) for name, search in searches.items()}
+        results = {}
+        for name, future in futures.items():
+            try:
+                results[name] = future.result()
+            except Exception as e:
+                results[name] = {"error": str(e)}
+
+        errors = {name: r["error"] for name, r in results.items() if "error" in r}
+        if len(errors) == len(results):
+            return {"error": "; ".join(f"{name}: {error}" for name, error in errors.items())}
+
+        # SerpAPI first so its richer records are kept as the primary copy
+        combined = [event for name in ("serpapi", "ticketmaster") if name in results and name not in errors for event in results[name].get("events", [])]
+        events, merged = dedupe_events(combined)
+        events.sort(key=lambda e: (e.date or "9999-99-99", e.time or ""))
+
+        feed = {
+            "location": location,
+            "query": query,
+            "sources": {name: len(r.get("events", [])) for name, r in results.items() if name not in errors},
+            "duplicates_merged": merged,
+            "events_found": len(events),
+            "events": events,
+        }
+        if errors:
+            feed["errors"] = errors
+        return feed
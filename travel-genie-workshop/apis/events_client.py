@@ -5,14 +5,24 @@ https://serpapi.com/google-events-api
 
 import os
 import json
-from typing import Optional
-import requests
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional
+
+from .cache import cached
+from .http import RevalidatingSession
+from .memo import memoize
+from .models import Event
+from .pagination import DATE_FILTER_WINDOWS, PaginationError, date_window, filter_events
 
 
 class EventsClient:
     """Client for SerpAPI Google Events search."""
     
     BASE_URL = "https://serpapi.com/search"
+    ACCOUNT_URL = "https://serpapi.com/account.json"
+    EVENTS_TTL_S = 60 * 60
+    PAGE_SIZE = 10  # Google Events returns 10 results per page
+    MAX_PAGES = 5
     
     def __init__(self):
         self.api_key = os.getenv("SERPAPI_API_KEY")
@@ -22,12 +32,106 @@ class EventsClient:
                 "SERPAPI_API_KEY environment variable required. "
                 "Get a free key at: https://serpapi.com/"
             )
+        self.session = RevalidatingSession()
+    
+    def probe(self, timeout: float) -> dict:
+        """Health probe: an account lookup, which uses no search credits."""
+        response = self.session.get(self.ACCOUNT_URL, params={"api_key": self.api_key}, timeout=timeout)
+        return {"ok": True} if response.status_code == 200 else {"error": f"SerpAPI probe failed ({response.status_code})"}
+    
+    @staticmethod
+    def _iso_date(start_date: Optional[str]) -> Optional[str]:
+        """Turn Google Events' "Jan 20" into YYYY-MM-DD, assuming the next occurrence of that day."""
+        if not start_date:
+            return None
+        today = date.today()
+        try:
+            day = datetime.strptime(f"{start_date} {today.year}", "%b %d %Y").date()
+        except ValueError:
+            return start_date
+        if day < today - timedelta(days=1):
+            day = day.replace(year=today.year + 1)
+        return day.isoformat()
+    
+    def _parse_event(self, event: dict) -> Event:
+        date_info = event.get("date", {})
+        return Event(
+            title=event.get("title"),
+            date=self._iso_date(date_info.get("start_date")),
+            time=date_info.get("when"),
+            venue=event.get("venue", {}).get("name"),
+            address=event.get("address", []),
+            description=event.get("description"),
+            link=event.get("link"),
+            thumbnail=event.get("thumbnail"),
+            source="serpapi",
+        )
+    
+    def iter_events(
+        self,
+        location: str,
+        query: Optional[str] = None,
+        date_filter: str = "week",
+        keyword: Optional[str] = None,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        max_pages: int = MAX_PAGES
+    ) -> Iterator[Event]:
+        """
+        Lazily page through events, yielding those that pass the filters.
+        
+        Pages are only requested while the caller keeps consuming, so
+        stopping after the first 5 events usually costs a single request.
+        
+        Args:
+            location: City or location name (e.g., "Paris, France")
+            query: Optional search query sent to Google (e.g., "concerts")
+            date_filter: "today", "tomorrow", "week", "weekend", "next_week", "month", "next_month"
+            keyword: Only keep events whose title/description/venue contain these words
+            start_date, end_date: Optional YYYY-MM-DD bounds, overriding date_filter locally
+        """
+        search_query = f"{query} events in {location}" if query else f"events in {location}"
+        window_start, window_end = date_window(date_filter, start_date, end_date)
+        
+        def pages() -> Iterator[Event]:
+            for page in range(max_pages):
+                params = {
+                    "engine": "google_events",
+                    "q": search_query,
+                    "hl": "en",
+                    "start": page * self.PAGE_SIZE,
+                    "api_key": self.api_key
+                }
+                if date_filter in DATE_FILTER_WINDOWS:
+                    params["htichips"] = f"date:{date_filter}"
+                
+                response = self.session.get(self.BASE_URL, params=params)
+                if response.status_code != 200:
+                    raise PaginationError(f"SerpAPI error: {response.text}")
+                
+                data = response.json()
+                if "error" in data:
+                    # SerpAPI reports running past the last page as an error too
+                    if page:
+                        return
+                    raise PaginationError(data["error"])
+                
+                results = data.get("events_results", [])
+                for event in results:
+                    yield self._parse_event(event)
+                if len(results) < self.PAGE_SIZE:
+                    return
+        
+        return filter_events(pages(), keyword, window_start, window_end)
     
+    @memoize
+    @cached(ttl=EVENTS_TTL_S)
     def get_events(
         self,
         location: str,
         query: Optional[str] = None,
-        date_filter: str = "week"
+        date_filter: str = "week",
+        max_results: int = PAGE_SIZE
     ) -> dict:
         """
         Search for events in a location.
@@ -36,43 +140,18 @@ class EventsClient:
             location: City or location name (e.g., "Paris, France")
             query: Optional search query (e.g., "concerts", "sports")
             date_filter: Time filter - "today", "tomorrow", "week", "month"
+            max_results: Stop paging once this many events are found (default: one page)
         """
-        search_query = f"events in {location}"
-        if query:
-            search_query = f"{query} events in {location}"
-        
-        params = {
-            "engine": "google_events",
-            "q": search_query,
-            "hl": "en",
-            "api_key": self.api_key
-        }
-        
-        response = requests.get(self.BASE_URL, params=params)
-        
-        if response.status_code != 200:
-            return {"error": f"SerpAPI error: {response.text}"}
-        
-        data = response.json()
-        
-        if "error" in data:
-            return {"error": data["error"]}
-        
-        events_results = data.get("events_results", [])
-        
+        stream = self.iter_events(location, query=query, date_filter=date_filter)
         events = []
-        for event in events_results[:15]:
-            date_info = event.get("date", {})
-            events.append({
-                "title": event.get("title"),
-                "date": date_info.get("start_date"),
-                "time": date_info.get("when"),
-                "venue": event.get("venue", {}).get("name"),
-                "address": event.get("address", []),
-                "description": event.get("description"),
-                "link": event.get("link"),
-                "thumbnail": event.get("thumbnail"),
-            })
+        try:
+            for event in stream:
+                events.append(event)
+                if len(events) >= max_results:
+                    break
+        except PaginationError as e:
+            if not events:
+                return {"error": str(e)}
         
         return {
             "location": location,
@@ -0,0 +1,105 @@
+"""
+In-memory geospatial index for hotels, attractions and restaurants.
+
+Records with `latitude`/`longitude` (Hotel, Place) are bucketed into a uniform
+lat/lon grid so radius queries only measure nearby cells; distances are
+computed with a vectorized haversine over NumPy arrays.
+"""
+
+import math
+from collections import defaultdict
+from typing import Any, List, Sequence, Tuple
+
+import numpy as np
+
+EARTH_RADIUS_KM = 6371.0088
+KM_PER_DEGREE_LAT = 111.32
+
+
+def has_coordinates(record: Any) -> bool:
+    return getattr(record, "latitude", None) is not None and getattr(record, "longitude", None) is not None
+
+
+def coordinates(records: Sequence[Any]) -> np.ndarray:
+    """(n, 2) array of [latitude, longitude] in degrees."""
+    return np.array([[r.latitude, r.longitude] for r in records], dtype=np.float64).reshape(-1, 2)
+
+
+def haversine_km(points_a: np.ndarray, points_b: np.ndarray) -> np.ndarray:
+    """Pairwise great-circle distances in km between (n, 2) and (m, 2) lat/lon arrays -> (n, m)."""
+    lat_a, lon_a = np.radians(points_a[:, 0])[:, None], np.radians(points_a[:, 1])[:, None]
+    lat_b, lon_b = np.radians(points_b[:, 0])[None, :], np.radians(points_b[:, 1])[None, :]
+    h = np.sin((lat_b - lat_a) / 2) ** 2 + np.cos(lat_a) * np.cos(lat_b) * np.sin((lon_b - lon_a) / 2) ** 2
+    return 2 * EARTH_RADIUS_KM * np.arcsin(np.sqrt(np.clip(h, 0.0, 1.0)))
+
+
+class GeoIndex:
+    """Uniform grid index over records that carry coordinates."""
+
+    def __init__(self, records: Sequence[Any], cell_deg: float = 0.01):
+        self.cell_deg = cell_deg
+        self.records = [r for r in records if has_coordinates(r)]
+        self.points = coordinates(self.records)
+        self._cells = defaultdict(list)
+        for i, (lat, lon) in enumerate(self.points):
+            self._cells[self._cell(lat, lon)].append(i)
+
+    def __len__(self) -> int:
+        return len(self.records)
+
+    def _cell(self, lat: float, lon: float) -> Tuple[int, int]:
+        return int(math.floor(lat / self.cell_deg)), int(math.floor(lon / self.cell_deg))
+
+    def radius_query(self, latitude: float, longitude: float, radius_km: float) -> List[Tuple[Any, float]]:
+        """Records within radius_km of a point as (record, distance_km), nearest first."""
+        if not self.records:
+            return []
+        lat_span = radius_km / KM_PER_DEGREE_LAT
+        lon_span = radius_km / (KM_PER_DEGREE_LAT * max(math.cos(math.radians(latitude)), 1e-6))
+        (lat_lo, lon_lo), (lat_hi, lon_hi) = self._cell(latitude - lat_span, longitude - lon_span), self._cell(latitude + lat_span, longitude + lon_span)
+
+        candidates = []
+        if (lat_hi - lat_lo + 1) * (lon_hi - lon_lo + 1) > len(self._cells):
+            # Radius covers more cells than are occupied; scanning occupied cells is cheaper
+            for (cell_lat, cell_lon), members in self._cells.items():
+                if lat_lo <= cell_lat <= lat_hi and lon_lo <= cell_lon <= lon_hi:
+                    candidates.extend(members)
+        else:
+            for cell_lat in range(lat_lo, lat_hi + 1):
+                for cell_lon in range(lon_lo, lon_hi + 1):
+                    candidates.extend(self._cells.get((cell_lat, cell_lon), ()))
+        if not candidates:
+            return []
+
+        idx = np.array(candidates)
+        distances = haversine_km(np.array([[latitude, longitude]]), self.points[idx])[0]
+        within = distances <= radius_km
+        order = np.argsort(distances[within])
+        return [(self.records[i], float(d)) for i, d in zip(idx[within][order], distances[within][order])]
+
+
+def near_point(records: Sequence[Any], latitude: float, longitude: float, radius_km: float) -> List[Any]:
+    """Drop records located farther than radius_km from a point; records without coordinates are kept."""
+    nearby = {id(record) for record, _ in GeoIndex(records).radius_query(latitude, longitude, radius_km)}
+    return [r for r in records if not has_coordinates(r) or id(r) in nearby]
+
+
+def rank_by_proximity(hotels: Sequence[Any], sights: Sequence[Any], top_sights: int = 5, limit: int = 5) -> List[dict]:
+    """Hotels ordered by mean distance to the top sights (sights assumed ordered by relevance)."""
+    hotels = [h for h in hotels if has_coordinates(h)]
+    sights = [s for s in sights if has_coordinates(s)][:top_sights]
+    if not hotels or not sights:
+        return []
+
+    distances = haversine_km(coordinates(hotels), coordinates(sights))
+    mean_km = distances.mean(axis=1)
+    nearest = distances.argmin(axis=1)
+    ranked = []
+    for i in np.argsort(mean_km)[:limit]:
+        ranked.append({
+            "name": hotels[i].name,
+            "avg_km_to_top_sights": round(float(mean_km[i]), 2),
+            "nearest_sight": sights[nearest[i]].name,
+            "nearest_sight_km": round(float(distances[i, nearest[i]]), 2),
+        })
+    return ranked
@@ -0,0 +1,80 @@
+"""
+Persistent city geocode cache.
+
+Maps a normalized city name to coordinates and country so a city is resolved
+once and then looked up by coordinates (weather) or used as a reference point
+(hotel proximity, itinerary planning). Entries come from OpenWeatherMap
+responses, which are authoritative, and from the centroid of Places results,
+which only fill gaps. The cache is a small JSON file written atomically.
+"""
+
+import json
+import os
+import re
+import threading
+from typing import Optional
+
+DEFAULT_PATH = os.path.join(os.path.expanduser("~"), ".cache", "travelgenie", "geocode.json")
+
+# Higher wins when two sources disagree
+SOURCE_PRIORITY = {"places": 1, "openweathermap": 2}
+
+
+def normalize_city(name: str) -> str:
+    """Lowercase and collapse whitespace, e.g. "  New  York " -> "new york"."""
+    return re.sub(r"\s+", " ", (name or "").strip().lower())
+
+
+class GeocodeCache:
+    """Thread-safe city -> {latitude, longitude, country, name, source} map backed by a JSON file.
+
+    `country` is an ISO 3166-1 alpha-2 code as returned by OpenWeatherMap (e.g. "FR").
+    """
+
+    def __init__(self, path: Optional[str] = None):
+        self.path = path or os.getenv("GEOCODE_CACHE_PATH", DEFAULT_PATH)
+        self._lock = threading.Lock()
+        self._entries = self._load()
+
+    def _load(self) -> dict:
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError):
+            return {}
+
+    def _save(self) -> None:
+        try:
+            os.makedirs(os.path.dirname(self.path), exist_ok=True)
+            tmp_path = f"{self.path}.tmp"
+            with open(tmp_path, "w", encoding="utf-8") as f:
+                json.dump(self._entries, f, ensure_ascii=False)
+            os.replace(tmp_path, self.path)
+        except OSError as e:
+            print(f"📍 Could not persist geocode cache: {e}")
+
+    def get(self, city: str) -> Optional[dict]:
+        with self._lock:
+            return self._entries.get(normalize_city(city))
+
+    def put(self, city: str, latitude: float, longitude: float, country: Optional[str] = None, name: Optional[str] = None, source: str = "openweathermap") -> None:
+        """Record a city's coordinates unless a higher-priority source already has."""
+        key = normalize_city(city)
+        if not key or latitude is None or longitude is None:
+            return
+        entry = {"latitude": latitude, "longitude": longitude, "country": country, "name": name or city.strip(), "source": source}
+        with self._lock:
+            existing = self._entries.get(key)
+            if existing and SOURCE_PRIORITY.get(existing.get("source"), 0) > SOURCE_PRIORITY.get(source, 0):
+                return
+            if existing and all(existing.get(k) == v for k, v in entry.items()):
+                return
+            self._entries[key] = entry
+            self._save()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return len(self._entries)
+
+
+geocode_cache = GeocodeCache()
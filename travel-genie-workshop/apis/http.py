@@ -0,0 +1,116 @@
+"""
+HTTP session with conditional revalidation.
+
+When a GET response carries an ETag or Last-Modified validator, its body is
+kept (bounded LRU). The next identical GET sends If-None-Match /
+If-Modified-Since; a 304 costs only headers and is turned back into a 200
+with the stored body, so client parsing code is unchanged. Together with the
+response cache's stale-while-revalidate, an expired entry is served at once
+and its background refresh is usually just a 304.
+
+Every request's timeout is also capped by the caller's `request_deadline`, so
+a slow provider cannot overrun the agent's turn budget.
+"""
+
+import contextvars
+import threading
+import time
+from collections import OrderedDict
+from contextlib import contextmanager
+from typing import Iterator, Optional
+
+import requests
+from requests.structures import CaseInsensitiveDict
+
+DEFAULT_MAX_VALIDATED = 256
+
+_deadline: contextvars.ContextVar = contextvars.ContextVar("request_deadline", default=None)
+
+
+@contextmanager
+def request_deadline(deadline: Optional[float]) -> Iterator[None]:
+    """Cap request timeouts in this context at the time left before `deadline` (a time.monotonic() value)."""
+    token = _deadline.set(deadline)
+    try:
+        yield
+    finally:
+        _deadline.reset(token)
+
+
+def deadline_timeout(timeout: Optional[float]) -> Optional[float]:
+    """The smaller of `timeout` and the time left before the current deadline."""
+    deadline = _deadline.get()
+    if deadline is None:
+        return timeout
+    left = deadline - time.monotonic()
+    if left <= 0:
+        raise requests.exceptions.Timeout("Time budget exhausted before the request was sent")
+    return left if timeout is None else min(timeout, left)
+
+
+class RevalidatingSession(requests.Session):
+    """requests.Session that revalidates repeated GETs with stored ETag/Last-Modified validators.
+
+    Every client holds one, so its connections are pooled and kept alive between calls.
+    """
+
+    def __init__(self, max_entries: int = DEFAULT_MAX_VALIDATED):
+        super().__init__()
+        self.max_entries = max_entries
+        self._validated = OrderedDict()  # prepared URL -> (etag, last_modified, content, headers, encoding)
+        self._validated_lock = threading.Lock()
+        self.revalidated = 0
+        self.full_fetches = 0
+
+    def _stored(self, url: str) -> Optional[tuple]:
+        with self._validated_lock:
+            entry = self._validated.get(url)
+            if entry is not None:
+                self._validated.move_to_end(url)
+            return entry
+
+    def _store(self, url: str, response: requests.Response) -> None:
+        etag, last_modified = response.headers.get("ETag"), response.headers.get("Last-Modified")
+        with self._validated_lock:
+            if not etag and not last_modified:
+                self._validated.pop(url, None)
+                return
+            self._validated[url] = (etag, last_modified, response.content, CaseInsensitiveDict(response.headers), response.encoding)
+            self._validated.move_to_end(url)
+            while len(self._validated) > self.max_entries:
+                self._validated.popitem(last=False)
+
+    def request(self, method, url, params=None, headers=None, **kwargs):
+        kwargs["timeout"] = deadline_timeout(kwargs.get("timeout"))
+        if method.upper() != "GET":
+            return super().request(method, url, params=params, headers=headers, **kwargs)
+
+        # Key on the full URL including query string, as the server does
+        key = requests.Request("GET", url, params=params).prepare().url
+        stored = self._stored(key)
+        headers = dict(headers or {})
+        if stored:
+            etag, last_modified = stored[0], stored[1]
+            if etag:
+                headers["If-None-Match"] = etag
+            if last_modified:
+                headers["If-Modified-Since"] = last_modified
+
+        response = super().request(method, url, params=params, headers=headers, **kwargs)
+
+        if response.status_code == 304 and stored:
+            self.revalidated += 1
+            _, _, content, stored_headers, encoding = stored
+            response.status_code = 200
+            response._content = content
+            response.headers = CaseInsensitiveDict({**stored_headers, **response.headers})
+            response.encoding = encoding
+            return response
+        if response.status_code == 200:
+            self.full_fetches += 1
+            self._store(key, response)
+        return response
+
+    def stats(self) -> dict:
+        with self._validated_lock:
+            return {"validated_urls": len(self._validated), "revalidated": self.revalidated, "full_fetches": self.full_fetches}
@@ -0,0 +1,118 @@
+"""
+Per-turn memoization for API client calls.
+
+A TurnMemo is active for one graph invocation. Client methods decorated with
+@memoize reuse the result of an identical call made earlier in the same turn
+(e.g. get_weather followed by create_itinerary for the same city). Outside a
+turn the decorator is a plain pass-through. The memo lives in a contextvar, so
+worker pools must submit through `contextvars.copy_context().run` to share it.
+"""
+
+import contextvars
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Iterator, Optional, Tuple
+
+_current_memo: contextvars.ContextVar = contextvars.ContextVar("turn_memo", default=None)
+
+
+def _normalize(value: Any) -> Any:
+    """Make an argument hashable and insensitive to case/whitespace in strings."""
+    if isinstance(value, str):
+        return value.strip().lower()
+    if isinstance(value, (list, tuple)):
+        return tuple(_normalize(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _normalize(v)) for k, v in value.items()))
+    return value
+
+
+def call_key(func: Callable, signature: inspect.Signature, args: tuple, kwargs: dict) -> tuple:
+    """Build a canonical key for a bound method call, ignoring `self`.
+
+    Positional vs keyword arguments and omitted defaults map to the same key,
+    so get_restaurants("Paris") and get_restaurants(city="paris", cuisine=None) match.
+    """
+    bound = signature.bind(*args, **kwargs)
+    bound.apply_defaults()
+    arguments = list(bound.arguments.items())[1:]
+    return (func.__qualname__, tuple((name, _normalize(value)) for name, value in arguments))
+
+
+def is_error(result: Any) -> bool:
+    """Client methods report failures as {"error": ...} dicts; those are never reused."""
+    return isinstance(result, dict) and "error" in result
+
+
+class TurnMemo:
+    """Results of client calls made during one agent turn."""
+
+    def __init__(self):
+        self._results = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+
+    def lookup(self, key: tuple) -> Tuple[bool, Any]:
+        with self._lock:
+            if key in self._results:
+                value, elapsed = self._results[key]
+                self.hits += 1
+                self.seconds_saved += elapsed
+                return True, value
+            self.misses += 1
+            return False, None
+
+    def store(self, key: tuple, value: Any, elapsed: float) -> None:
+        with self._lock:
+            self._results[key] = (value, elapsed)
+
+    def stats(self) -> dict:
+        with self._lock:
+            return {"hits": self.hits, "misses": self.misses, "seconds_saved": round(self.seconds_saved, 3)}
+
+
+def current_memo() -> Optional[TurnMemo]:
+    return _current_memo.get()
+
+
+@contextmanager
+def turn_scope() -> Iterator[TurnMemo]:
+    """Activate a fresh TurnMemo for the duration of the block."""
+    memo = TurnMemo()
+    token = _current_memo.set(memo)
+    try:
+        yield memo
+    finally:
+        _current_memo.reset(token)
+
+
+def memoize(func: Callable) -> Callable:
+    """Reuse identical client calls within the active turn.
+
+    Results are shared between callers, so treat them as read-only.
+    """
+    signature = inspect.signature(func)
+
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        memo = _current_memo.get()
+        if memo is None:
+            return func(*args, **kwargs)
+
+        key = call_key(func, signature, args, kwargs)
+        found, value = memo.lookup(key)
+        if found:
+            return value
+
+        start = time.perf_counter()
+        value = func(*args, **kwargs)
+        if not is_error(value):
+            memo.store(key, value, time.perf_counter() - start)
+        return value
+
+    return wrapper
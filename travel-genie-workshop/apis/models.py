@@ -0,0 +1,112 @@
+"""
+Compact typed records for provider results.
+
+Clients return these slotted records inside their result dicts instead of
+per-item dicts, and tools serialize everything with `dumps`. Fields that are
+None are omitted from the JSON, so providers that fill fewer fields produce
+smaller payloads.
+"""
+
+import json
+from dataclasses import dataclass, fields
+from typing import Any, List, Optional
+
+
+@dataclass(slots=True)
+class FlightOffer:
+    airline: Optional[str] = None
+    flight_number: Optional[str] = None
+    origin: Optional[str] = None
+    destination: Optional[str] = None
+    departure_time: Optional[str] = None
+    arrival_time: Optional[str] = None
+    duration: Optional[str] = None
+    stops: Optional[int] = None
+    price: Optional[str] = None
+    currency: Optional[str] = None
+    offer_id: Optional[str] = None
+    seats_available: Optional[int] = None
+    cabin_class: Optional[str] = None
+
+
+@dataclass(slots=True)
+class Hotel:
+    name: Optional[str] = None
+    hotel_id: Optional[str] = None
+    city: Optional[str] = None
+    address: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+    distance_km: Optional[float] = None
+    check_in: Optional[str] = None
+    check_out: Optional[str] = None
+    price: Optional[Any] = None
+    currency: Optional[str] = None
+    rating: Optional[float] = None
+
+
+@dataclass(slots=True)
+class Place:
+    name: Optional[str] = None
+    address: Optional[str] = None
+    rating: Optional[float] = None
+    total_reviews: Optional[int] = None
+    types: Optional[List[str]] = None
+    price_range: Optional[str] = None
+    price_category: Optional[str] = None
+    latitude: Optional[float] = None
+    longitude: Optional[float] = None
+
+
+@dataclass(slots=True)
+class Event:
+    title: Optional[str] = None
+    date: Optional[str] = None
+    time: Optional[str] = None
+    venue: Optional[str] = None
+    address: Optional[List[str]] = None
+    description: Optional[str] = None
+    link: Optional[str] = None
+    thumbnail: Optional[str] = None
+    source: Optional[str] = None
+
+
+@dataclass(slots=True)
+class DailyForecast:
+    date: str
+    day: str
+    temp_high_c: int
+    temp_low_c: int
+    temp_high_f: int
+    temp_low_f: int
+    description: str
+
+
+RECORD_TYPES = (FlightOffer, Hotel, Place, Event, DailyForecast)
+
+# Field names per record type, resolved once instead of on every encode
+_FIELD_NAMES = {cls: tuple(f.name for f in fields(cls)) for cls in RECORD_TYPES}
+
+
+def to_dict(record: Any) -> dict:
+    """Shallow dict of a record's non-None fields."""
+    result = {}
+    for name in _FIELD_NAMES[type(record)]:
+        value = getattr(record, name)
+        if value is not None:
+            result[name] = value
+    return result
+
+
+def _default(obj: Any) -> Any:
+    if type(obj) in _FIELD_NAMES:
+        return to_dict(obj)
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+_encoder = json.JSONEncoder(default=_default, ensure_ascii=False, separators=(",", ":"))
+
+
+def dumps(result: Any) -> str:
+    """Serialize a client result (dicts, lists and records) to compact JSON."""
+    return _encoder.encode(result)
@@ -0,0 +1,64 @@
+"""
+Helpers for lazily paginated provider searches.
+
+Clients expose `iter_*` generators that fetch one page at a time and yield
+records as they are parsed; callers stop iterating once they have enough, so
+no further pages are requested past the limit.
+"""
+
+from datetime import date, datetime, timedelta
+from typing import Iterator, Optional, Tuple
+
+# date_filter value -> (first day offset, last day offset) from today
+DATE_FILTER_WINDOWS = {
+    "today": (0, 0),
+    "tomorrow": (1, 1),
+    "week": (0, 7),
+    "weekend": (0, 7),
+    "next_week": (7, 14),
+    "month": (0, 31),
+    "next_month": (31, 62),
+}
+
+
+class PaginationError(Exception):
+    """A page request failed after earlier pages may already have been yielded."""
+
+
+def date_window(date_filter: Optional[str], start_date: Optional[str] = None, end_date: Optional[str] = None) -> Tuple[Optional[date], Optional[date]]:
+    """Resolve explicit YYYY-MM-DD bounds, or a named filter such as "week", into a date range."""
+    if start_date or end_date:
+        start = datetime.strptime(start_date, "%Y-%m-%d").date() if start_date else None
+        end = datetime.strptime(end_date, "%Y-%m-%d").date() if end_date else None
+        return start, end
+    if date_filter not in DATE_FILTER_WINDOWS:
+        return None, None
+    first, last = DATE_FILTER_WINDOWS[date_filter]
+    today = date.today()
+    return today + timedelta(days=first), today + timedelta(days=last)
+
+
+def in_window(iso_date: Optional[str], start: Optional[date], end: Optional[date]) -> bool:
+    """Whether a YYYY-MM-DD date falls in [start, end]. Unknown dates are kept."""
+    if not iso_date:
+        return True
+    try:
+        day = datetime.strptime(iso_date[:10], "%Y-%m-%d").date()
+    except ValueError:
+        return True
+    return (start is None or day >= start) and (end is None or day <= end)
+
+
+def matches_keyword(keyword: Optional[str], *texts: Optional[str]) -> bool:
+    """Case-insensitive: every word of `keyword` appears in one of `texts`."""
+    if not keyword:
+        return True
+    haystack = " ".join(t for t in texts if t).lower()
+    return all(word in haystack for word in keyword.lower().split())
+
+
+def filter_events(events: Iterator, keyword: Optional[str], start: Optional[date], end: Optional[date]) -> Iterator:
+    """Apply keyword and date filters to a stream of Event records."""
+    for event in events:
+        if in_window(event.date, start, end) and matches_keyword(keyword, event.title, event.description, event.venue):
+            yield event
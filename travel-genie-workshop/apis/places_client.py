@@ -5,14 +5,82 @@ https://developers.google.com/maps/documentation/places/web-service/op-overview
 
 import os
 import json
-from typing import Optional
-import requests
+from statistics import median
+from typing import Iterator, List, Optional
+
+from .cache import cached
+from .geocode import geocode_cache
+from .http import RevalidatingSession
+from .memo import memoize
+from .models import Place
+from .pagination import PaginationError
+
+
+# Each parser declares the Places fields it reads; requests ask for exactly those,
+# keeping responses small and the request in the cheapest billing tier that covers them.
+NAMES_ONLY_FIELD_MASK = "places.displayName"
+
+
+def _parse_name_only(place: dict) -> Place:
+    return Place(name=place.get("displayName", {}).get("text"))
+
+
+ATTRACTION_FIELD_MASK = "places.displayName,places.formattedAddress,places.rating,places.userRatingCount,places.types,places.location"
+
+
+def _parse_attraction(place: dict) -> Place:
+    return Place(
+        name=place.get("displayName", {}).get("text"),
+        address=place.get("formattedAddress"),
+        rating=place.get("rating"),
+        total_reviews=place.get("userRatingCount"),
+        types=[t.replace("_", " ").title() for t in place.get("types", [])[:3]],
+        latitude=place.get("location", {}).get("latitude"),
+        longitude=place.get("location", {}).get("longitude"),
+    )
+
+
+RESTAURANT_FIELD_MASK = "places.displayName,places.formattedAddress,places.rating,places.userRatingCount,places.priceLevel,places.location"
+RESTAURANT_PRICE_MAP = {"PRICE_LEVEL_INEXPENSIVE": "$", "PRICE_LEVEL_MODERATE": "$$", "PRICE_LEVEL_EXPENSIVE": "$$$", "PRICE_LEVEL_VERY_EXPENSIVE": "$$$$"}
+
+
+def _parse_restaurant(place: dict) -> Place:
+    return Place(
+        name=place.get("displayName", {}).get("text"),
+        address=place.get("formattedAddress"),
+        rating=place.get("rating"),
+        total_reviews=place.get("userRatingCount"),
+        price_range=RESTAURANT_PRICE_MAP.get(place.get("priceLevel"), "N/A"),
+        latitude=place.get("location", {}).get("latitude"),
+        longitude=place.get("location", {}).get("longitude"),
+    )
+
+
+# No opening hours or types; location is kept for proximity ranking
+HOTEL_FIELD_MASK = "places.displayName,places.formattedAddress,places.rating,places.userRatingCount,places.priceLevel,places.location"
+HOTEL_PRICE_MAP = {"PRICE_LEVEL_INEXPENSIVE": "Economy", "PRICE_LEVEL_MODERATE": "Mid-Range", "PRICE_LEVEL_EXPENSIVE": "Upscale", "PRICE_LEVEL_VERY_EXPENSIVE": "Luxury"}
+
+
+def _parse_hotel(place: dict) -> Place:
+    return Place(
+        name=place.get("displayName", {}).get("text"),
+        address=place.get("formattedAddress"),
+        rating=place.get("rating"),
+        total_reviews=place.get("userRatingCount"),
+        price_category=HOTEL_PRICE_MAP.get(place.get("priceLevel"), "Unknown"),
+        latitude=place.get("location", {}).get("latitude"),
+        longitude=place.get("location", {}).get("longitude"),
+    )
 
 
 class PlacesClient:
     """Client for Google Places API (New v1)."""
     
     BASE_URL = "https://places.googleapis.com/v1/places"
+    PLACES_TTL_S = 24 * 3600
+    # Records hold only slow-changing fields (no opening hours), so a week-old copy is safe to serve while refreshing
+    PLACES_STALE_TTL_S = 7 * 24 * 3600
+    MAX_PAGE_SIZE = 20  # Text Search returns at most 20 places per page and 60 in total
     
     def __init__(self):
         self.api_key = os.getenv("GOOGLE_PLACES_API_KEY")
@@ -22,90 +90,108 @@ class PlacesClient:
                 "GOOGLE_PLACES_API_KEY environment variable required. "
                 "Get a key at: https://console.cloud.google.com/"
             )
+        self.session = RevalidatingSession()
     
-    def _text_search(self, query: str, max_results: int = 10) -> dict:
-        """Perform a text search using the new Places API."""
+    def probe(self, timeout: float) -> dict:
+        """Health probe: an IDs-only text search, the free SKU."""
+        headers = {"Content-Type": "application/json", "X-Goog-Api-Key": self.api_key, "X-Goog-FieldMask": "places.id"}
+        response = self.session.post(f"{self.BASE_URL}:searchText", headers=headers, json={"textQuery": "Paris", "pageSize": 1}, timeout=timeout)
+        return {"ok": True} if response.status_code == 200 else {"error": f"Places probe failed ({response.status_code})"}
+    
+    def _text_search(self, query: str, field_mask: str, page_size: int = 10, page_token: Optional[str] = None) -> dict:
+        """Perform a text search using the new Places API, returning only the fields in `field_mask`."""
         url = f"{self.BASE_URL}:searchText"
         
         headers = {
             "Content-Type": "application/json",
             "X-Goog-Api-Key": self.api_key,
-            "X-Goog-FieldMask": "places.displayName,places.formattedAddress,places.rating,places.userRatingCount,places.types,places.location,places.currentOpeningHours,places.priceLevel"
+            "X-Goog-FieldMask": field_mask
         }
         
-        data = {"textQuery": query, "maxResultCount": max_results}
+        data = {"textQuery": query, "pageSize": page_size}
+        if page_token:
+            data["pageToken"] = page_token
         
-        response = requests.post(url, headers=headers, json=data)
+        response = self.session.post(url, headers=headers, json=data)
         
         if response.status_code != 200:
             return {"error": f"Places API error: {response.text}"}
         
         return response.json()
     
-    def get_attractions(self, city: str, max_results: int = 10) -> dict:
-        """Get tourist attractions in a city."""
-        result = self._text_search(f"tourist attractions landmarks in {city}", max_results)
+    def iter_text_search(self, query: str, field_mask: str, page_size: int = MAX_PAGE_SIZE) -> Iterator[dict]:
+        """Lazily follow nextPageToken, yielding raw places; the next page is requested only when needed."""
+        page_token = None
+        while True:
+            result = self._text_search(query, f"{field_mask},nextPageToken", min(page_size, self.MAX_PAGE_SIZE), page_token)
+            if "error" in result:
+                raise PaginationError(result["error"])
+            yield from result.get("places", [])
+            page_token = result.get("nextPageToken")
+            if not page_token:
+                return
+    
+    def _search_places(self, query: str, max_results: int, names_only: bool, field_mask: str, parser) -> dict:
+        if names_only:
+            field_mask, parser = NAMES_ONLY_FIELD_MASK, _parse_name_only
+        
+        places = []
+        try:
+            for place in self.iter_text_search(query, field_mask, page_size=max_results):
+                places.append(parser(place))
+                if len(places) >= max_results:
+                    break
+        except PaginationError as e:
+            if not places:
+                return {"error": str(e)}
+        
+        return {"places": places}
+    
+    @memoize
+    @cached(ttl=PLACES_TTL_S, stale_ttl=PLACES_STALE_TTL_S)
+    def get_attractions(self, city: str, max_results: int = 10, names_only: bool = False) -> dict:
+        """Get tourist attractions in a city. names_only=True returns just names at a lower billing tier."""
+        result = self._search_places(f"tourist attractions landmarks in {city}", max_results, names_only, ATTRACTION_FIELD_MASK, _parse_attraction)
         
         if "error" in result:
             return result
         
-        places = result.get("places", [])
-        attractions = []
-        for place in places:
-            attractions.append({
-                "name": place.get("displayName", {}).get("text"),
-                "address": place.get("formattedAddress"),
-                "rating": place.get("rating"),
-                "total_reviews": place.get("userRatingCount"),
-                "types": [t.replace("_", " ").title() for t in place.get("types", [])[:3]],
-                "open_now": place.get("currentOpeningHours", {}).get("openNow"),
-            })
-        
+        attractions = result["places"]
+        self._remember_city_centre(city, attractions)
         return {"city": city, "attractions_found": len(attractions), "attractions": attractions}
     
-    def get_restaurants(self, city: str, cuisine: Optional[str] = None, max_results: int = 10) -> dict:
-        """Get restaurants in a city."""
+    @staticmethod
+    def _remember_city_centre(city: str, places: List[Place]) -> None:
+        """Use the median of a city's attraction coordinates as its geocode if none is known yet."""
+        if geocode_cache.get(city):
+            return
+        located = [p for p in places if p.latitude is not None and p.longitude is not None]
+        if not located:
+            return
+        # Addresses end in a localized country name, not the ISO code the cache stores; leave it to OWM
+        geocode_cache.put(city, median(p.latitude for p in located), median(p.longitude for p in located), source="places")
+    
+    @memoize
+    @cached(ttl=PLACES_TTL_S, stale_ttl=PLACES_STALE_TTL_S)
+    def get_restaurants(self, city: str, cuisine: Optional[str] = None, max_results: int = 10, names_only: bool = False) -> dict:
+        """Get restaurants in a city. names_only=True returns just names at a lower billing tier."""
         query = f"{cuisine} restaurants in {city}" if cuisine else f"best restaurants in {city}"
-        result = self._text_search(query, max_results)
+        result = self._search_places(query, max_results, names_only, RESTAURANT_FIELD_MASK, _parse_restaurant)
         
         if "error" in result:
             return result
         
-        places = result.get("places", [])
-        restaurants = []
-        for place in places:
-            price_map = {"PRICE_LEVEL_INEXPENSIVE": "$", "PRICE_LEVEL_MODERATE": "$$", "PRICE_LEVEL_EXPENSIVE": "$$$", "PRICE_LEVEL_VERY_EXPENSIVE": "$$$$"}
-            price_range = price_map.get(place.get("priceLevel"), "N/A")
-            
-            restaurants.append({
-                "name": place.get("displayName", {}).get("text"),
-                "address": place.get("formattedAddress"),
-                "rating": place.get("rating"),
-                "total_reviews": place.get("userRatingCount"),
-                "price_range": price_range,
-                "open_now": place.get("currentOpeningHours", {}).get("openNow"),
-            })
-        
+        restaurants = result["places"]
         return {"city": city, "cuisine": cuisine or "Various", "restaurants_found": len(restaurants), "restaurants": restaurants}
     
-    def get_hotels(self, city: str, max_results: int = 10) -> dict:
+    @memoize
+    @cached(ttl=PLACES_TTL_S, stale_ttl=PLACES_STALE_TTL_S)
+    def get_hotels(self, city: str, max_results: int = 10, names_only: bool = False) -> dict:
         """Get hotels in a city (backup for Booking.com)."""
-        result = self._text_search(f"hotels lodging in {city}", max_results)
+        result = self._search_places(f"hotels lodging in {city}", max_results, names_only, HOTEL_FIELD_MASK, _parse_hotel)
         
         if "error" in result:
             return result
         
-        places = result.get("places", [])
-        hotels = []
-        for place in places:
-            price_map = {"PRICE_LEVEL_INEXPENSIVE": "Economy", "PRICE_LEVEL_MODERATE": "Mid-Range", "PRICE_LEVEL_EXPENSIVE": "Upscale", "PRICE_LEVEL_VERY_EXPENSIVE": "Luxury"}
-            
-            hotels.append({
-                "name": place.get("displayName", {}).get("text"),
-                "address": place.get("formattedAddress"),
-                "rating": place.get("rating"),
-                "total_reviews": place.get("userRatingCount"),
-                "price_category": price_map.get(place.get("priceLevel"), "Unknown"),
-            })
-        
+        hotels = result["places"]
         return {"city": city, "hotels_found": len(hotels), "hotels": hotels}
@@ -0,0 +1,126 @@
+"""
+Day-by-day itinerary route planner.
+
+Clusters attraction coordinates into one group per trip day (k-means), orders
+each day's stops with nearest-neighbour plus 2-opt over a NumPy distance
+matrix, and slots the closest unused restaurants in for lunch and dinner.
+"""
+
+from datetime import datetime, timedelta
+from typing import Any, List, Sequence
+
+import numpy as np
+
+from .geo import coordinates, has_coordinates, haversine_km
+
+
+def kmeans(points: np.ndarray, k: int, iterations: int = 25) -> np.ndarray:
+    """Cluster label per point. Farthest-point initialization keeps results deterministic."""
+    k = min(k, len(points))
+    centers = [points[0]]
+    for _ in range(1, k):
+        distance_to_centers = haversine_km(points, np.array(centers)).min(axis=1)
+        centers.append(points[distance_to_centers.argmax()])
+    centers = np.array(centers)
+
+    labels = np.zeros(len(points), dtype=int)
+    for iteration in range(iterations):
+        new_labels = haversine_km(points, centers).argmin(axis=1)
+        if iteration and (new_labels == labels).all():
+            break
+        labels = new_labels
+        for c in range(k):
+            members = points[labels == c]
+            if len(members):
+                centers[c] = members.mean(axis=0)
+    return labels
+
+
+def order_route(distances: np.ndarray, start: int = 0) -> List[int]:
+    """Open path through all points: nearest-neighbour tour improved with 2-opt."""
+    n = len(distances)
+    route = [start]
+    unvisited = set(range(n)) - {start}
+    while unvisited:
+        last = route[-1]
+        nxt = min(unvisited, key=lambda j: distances[last, j])
+        route.append(nxt)
+        unvisited.remove(nxt)
+
+    improved = True
+    while improved:
+        improved = False
+        for i in range(1, n - 1):
+            for j in range(i + 1, n):
+                # Reverse route[i:j+1]; for an open path the edge after j may not exist
+                before = distances[route[i - 1], route[i]] + (distances[route[j], route[j + 1]] if j + 1 < n else 0)
+                after = distances[route[i - 1], route[j]] + (distances[route[i], route[j + 1]] if j + 1 < n else 0)
+                if after < before - 1e-9:
+                    route[i:j + 1] = reversed(route[i:j + 1])
+                    improved = True
+    return route
+
+
+def _trip_dates(start_date: str, end_date: str) -> List[str]:
+    start = datetime.strptime(start_date, "%Y-%m-%d").date()
+    end = datetime.strptime(end_date, "%Y-%m-%d").date()
+    if end < start:
+        raise ValueError(f"end_date {end_date} is before start_date {start_date}")
+    return [(start + timedelta(days=i)).isoformat() for i in range((end - start).days + 1)]
+
+
+def plan_days(attractions: Sequence[Any], restaurants: Sequence[Any], start_date: str, end_date: str) -> List[dict]:
+    """Structured day plan from Place records with coordinates. Empty if none have coordinates."""
+    sights = [a for a in attractions if has_coordinates(a)]
+    if not sights:
+        return []
+    dates = _trip_dates(start_date, end_date)
+    points = coordinates(sights)
+    labels = kmeans(points, len(dates))
+
+    # Bigger clusters first so the first days are the fullest
+    clusters = sorted({int(c) for c in labels}, key=lambda c: -int((labels == c).sum()))
+    eateries = [r for r in restaurants if has_coordinates(r)]
+    eatery_points = coordinates(eateries)
+    used = np.zeros(len(eateries), dtype=bool)
+
+    def closest_restaurant(point: np.ndarray):
+        if not eateries or used.all():
+            return None
+        distance = haversine_km(point[None, :], eatery_points)[0]
+        distance[used] = np.inf
+        best = int(distance.argmin())
+        used[best] = True
+        return {"name": eateries[best].name, "address": eateries[best].address, "km_from_route": round(float(distance[best]), 2)}
+
+    # With fewer areas than days, spread the free days between sightseeing days
+    sightseeing_days = np.round(np.linspace(0, len(dates) - 1, len(clusters))).astype(int) if len(clusters) > 1 else np.array([0])
+    by_day = {}
+    for day_index, cluster in zip(sightseeing_days, clusters):
+        members = np.flatnonzero(labels == cluster)
+        member_points = points[members]
+        distances = haversine_km(member_points, member_points)
+        # Start from the stop farthest from the cluster centre so the walk sweeps through it
+        start = int(haversine_km(member_points.mean(axis=0)[None, :], member_points)[0].argmax())
+        route = order_route(distances, start)
+
+        stops = []
+        for position, idx in enumerate(route):
+            sight = sights[members[idx]]
+            stop = {"name": sight.name, "address": sight.address}
+            if position:
+                stop["km_from_previous"] = round(float(distances[route[position - 1], idx]), 2)
+            stops.append(stop)
+
+        midday = member_points[route[(len(route) - 1) // 2]]
+        evening = member_points[route[-1]]
+        by_day[int(day_index)] = {
+            "stops": stops,
+            "lunch": closest_restaurant(midday),
+            "dinner": closest_restaurant(evening),
+            "total_km": round(float(sum(distances[a, b] for a, b in zip(route, route[1:]))), 2),
+        }
+    return [
+        {"day": i + 1, "date": date, **by_day.get(i, {"stops": [], "note": "Free day"})}
+        for i, date in enumerate(dates)
+    ]
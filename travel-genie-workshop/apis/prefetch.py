@@ -0,0 +1,70 @@
+"""
+Speculative prefetching of likely follow-up data.
+
+After a flight or hotel search resolves a destination, users almost always ask
+for its weather, attractions or restaurants next. The Prefetcher warms the
+shared response cache for those calls in the background, within the
+background quota, so the follow-up turn is served from cache.
+"""
+
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from typing import Optional
+
+from .cache import is_cached
+from .duffel_client import CITY_TO_AIRPORT
+from .quota import QuotaBudget, background_quota
+
+# First city name listed for each airport code, e.g. "CDG" -> "Paris"
+AIRPORT_TO_CITY = {}
+for _city, _code in CITY_TO_AIRPORT.items():
+    AIRPORT_TO_CITY.setdefault(_code, _city.title())
+
+
+def city_for_destination(destination: str) -> str:
+    """Map an IATA code back to its city name; anything else is returned unchanged."""
+    destination = destination.strip()
+    if len(destination) == 3 and destination.isalpha():
+        return AIRPORT_TO_CITY.get(destination.upper(), destination)
+    return destination
+
+
+class Prefetcher:
+    """Background warmer for destination data that usually follows a search."""
+
+    def __init__(self, quota: QuotaBudget = background_quota, max_workers: int = 2):
+        self.quota = quota
+        self._executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="prefetch")
+        self._pending = set()
+        self._lock = threading.Lock()
+
+    def prefetch_destination(self, destination: str, start_date: str, end_date: Optional[str] = None, weather_client=None, places_client=None) -> bool:
+        """Schedule weather, attractions and restaurants for a destination. Returns False if already scheduled."""
+        city = city_for_destination(destination)
+        end_date = end_date or start_date
+        key = (city.lower(), start_date, end_date)
+        with self._lock:
+            if key in self._pending:
+                return False
+            self._pending.add(key)
+
+        self._executor.submit(self._run, key, city, start_date, end_date, weather_client, places_client)
+        return True
+
+    def _run(self, key: tuple, city: str, start_date: str, end_date: str, weather_client, places_client) -> None:
+        try:
+            if weather_client and not is_cached(weather_client.fetch_forecast_data, city):
+                # One forecast request covers current conditions and the trip forecast
+                if self.quota.try_acquire("weather"):
+                    weather_client.get_weather_for_trip(city, start_date, end_date)
+
+            if places_client:
+                for method in (places_client.get_attractions, places_client.get_restaurants):
+                    if not is_cached(method, city) and self.quota.try_acquire("places"):
+                        method(city)
+            print(f"🔮 Prefetched destination data for {city}")
+        except Exception as e:
+            print(f"🔮 Prefetch for {city} failed: {e}")
+        finally:
+            with self._lock:
+                self._pending.discard(key)
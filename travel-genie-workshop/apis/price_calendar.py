@@ -0,0 +1,96 @@
+"""
+Flexible-date flight price calendar.
+
+Searches every departure date in a ±N-day window concurrently (with a bound on
+in-flight requests) over any client exposing `search_flights` (DuffelClient or
+AmadeusClient) and returns a compact date -> lowest price matrix. Each
+(route, date) cell is cached on its own, so overlapping windows reuse cells.
+"""
+
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+from typing import List
+
+from .cache import response_cache
+
+
+class PriceCalendar:
+    """Lowest fare per departure date around a target date."""
+
+    CELL_TTL_S = 30 * 60
+    MAX_WINDOW_DAYS = 7
+
+    def __init__(self, client, max_in_flight: int = 4):
+        self.client = client
+        self.max_in_flight = max_in_flight
+
+    def _cell(self, origin: str, destination: str, date: str, adults: int) -> dict:
+        key = ("price_calendar", type(self.client).__name__, origin, destination, date, adults)
+
+        def load() -> dict:
+            result = self.client.search_flights(origin, destination, date, adults=adults, preference="cheapest", max_results=1)
+            if "error" in result:
+                return result
+            flights = result.get("flights", [])
+            return {
+                "price": result.get("lowest_price"),
+                "currency": flights[0].currency if flights else None,
+                "offers": result.get("offers_considered", len(flights)),
+            }
+
+        return response_cache.get_or_load(key, load, self.CELL_TTL_S, 0)
+
+    @staticmethod
+    def window_dates(center_date: str, window_days: int) -> List[str]:
+        center = datetime.strptime(center_date, "%Y-%m-%d").date()
+        today = datetime.now().date()
+        dates = [center + timedelta(days=offset) for offset in range(-window_days, window_days + 1)]
+        return [d.isoformat() for d in dates if d >= today]
+
+    def search(self, origin: str, destination: str, center_date: str, window_days: int = 3, adults: int = 1) -> dict:
+        """Lowest price for each departure date in center_date ± window_days (past dates skipped)."""
+        window_days = max(0, min(window_days, self.MAX_WINDOW_DAYS))
+        try:
+            dates = self.window_dates(center_date, window_days)
+        except ValueError:
+            return {"error": f"Invalid date '{center_date}', expected YYYY-MM-DD"}
+        if not dates:
+            return {"error": "All dates in the requested window are in the past"}
+
+        origin, destination = origin.upper(), destination.upper()
+        with ThreadPoolExecutor(max_workers=self.max_in_flight) as executor:
+            futures = [executor.submit(contextvars.copy_context().run, self._cell, origin, destination, date, adults) for date in dates]
+        cells = []
+        for future in futures:
+            # One failing date (e.g. a timeout) must not discard the rest of the window
+            try:
+                cells.append(future.result())
+            except Exception as e:
+                cells.append({"error": str(e)})
+
+        calendar = {}
+        errors = {}
+        currency = None
+        for date, cell in zip(dates, cells):
+            if "error" in cell:
+                calendar[date] = None
+                errors[date] = str(cell["error"])[:200]
+                continue
+            calendar[date] = cell["price"]
+            currency = currency or cell["currency"]
+
+        priced = {d: p for d, p in calendar.items() if p is not None}
+        cheapest_date = min(priced, key=priced.get) if priced else None
+        result = {
+            "origin": origin,
+            "destination": destination,
+            "window": f"{dates[0]} to {dates[-1]}",
+            "currency": currency,
+            "calendar": calendar,
+            "cheapest_date": cheapest_date,
+            "cheapest_price": priced.get(cheapest_date),
+        }
+        if errors:
+            result["errors"] = errors
+        return result
@@ -0,0 +1,56 @@
+"""
+Call budgets for background (speculative) API traffic.
+
+Foreground tool calls are never throttled here; prefetching and cache warming
+ask for a slot first so they cannot eat a provider's free-tier quota.
+"""
+
+import os
+import threading
+import time
+from collections import deque
+from typing import Dict, Tuple
+
+
+# provider -> (max background calls, window in seconds)
+DEFAULT_BACKGROUND_LIMITS = {
+    "weather": (int(os.getenv("BACKGROUND_WEATHER_CALLS_PER_HOUR", "60")), 3600),
+    "places": (int(os.getenv("BACKGROUND_PLACES_CALLS_PER_HOUR", "40")), 3600),
+    "events": (int(os.getenv("BACKGROUND_EVENTS_CALLS_PER_DAY", "2")), 86400),
+    "ticketmaster": (int(os.getenv("BACKGROUND_TICKETMASTER_CALLS_PER_HOUR", "60")), 3600),
+}
+
+
+class QuotaBudget:
+    """Sliding-window call budget per provider."""
+
+    def __init__(self, limits: Dict[str, Tuple[int, float]]):
+        self.limits = dict(limits)
+        self._calls = {provider: deque() for provider in self.limits}
+        self._lock = threading.Lock()
+
+    def try_acquire(self, provider: str, calls: int = 1) -> bool:
+        """Reserve `calls` slots for a provider; False if that would exceed its budget."""
+        if provider not in self.limits:
+            return False
+        max_calls, window = self.limits[provider]
+        now = time.monotonic()
+        with self._lock:
+            history = self._calls[provider]
+            while history and history[0] <= now - window:
+                history.popleft()
+            if len(history) + calls > max_calls:
+                return False
+            history.extend([now] * calls)
+            return True
+
+    def remaining(self) -> dict:
+        now = time.monotonic()
+        with self._lock:
+            return {
+                provider: max_calls - sum(1 for t in self._calls[provider] if t > now - window)
+                for provider, (max_calls, window) in self.limits.items()
+            }
+
+
+background_quota = QuotaBudget(DEFAULT_BACKGROUND_LIMITS)
@@ -0,0 +1,120 @@
+"""
+Vectorized ranking of flight offers.
+
+All offers returned by a provider are loaded into columnar NumPy arrays
+(price, duration, stops, departure time). "cheapest" and "fastest" sort on
+their primary objective with the other columns as tie-breakers. "balanced"
+puts offers on the Pareto front over price/duration/stops first, ordered by a
+weighted score; the remaining offers follow by the same score.
+"""
+
+import re
+from datetime import datetime
+from typing import List, Sequence
+
+import numpy as np
+
+from .models import FlightOffer
+
+# Sort keys, most significant first, for single-objective preferences
+PREFERENCE_ORDER = {
+    "cheapest": ("price", "duration", "stops"),
+    "fastest": ("duration", "stops", "price"),
+}
+
+# Weights for (price, duration, stops) in the "balanced" score; lower is better
+BALANCED_WEIGHTS = (0.45, 0.35, 0.20)
+
+_ISO_DURATION = re.compile(r"P(?:(\d+)D)?T?(?:(\d+)H)?(?:(\d+)M)?")
+
+
+def parse_duration_minutes(duration: str) -> float:
+    """Parse an ISO 8601 duration such as "PT7H30M" or "P1DT2H" into minutes (NaN if unknown)."""
+    match = _ISO_DURATION.fullmatch(duration or "")
+    if not match or not any(match.groups()):
+        return np.nan
+    days, hours, minutes = (int(g) if g else 0 for g in match.groups())
+    return days * 1440 + hours * 60 + minutes
+
+
+def _to_float(value) -> float:
+    try:
+        return float(value)
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def _timestamp(value: str) -> float:
+    try:
+        return datetime.fromisoformat(value).timestamp()
+    except (TypeError, ValueError):
+        return np.nan
+
+
+def offers_to_columns(offers: Sequence[FlightOffer]) -> dict:
+    """Columnar arrays for the fields the ranking uses. Missing values are NaN."""
+    n = len(offers)
+    return {
+        "price": np.fromiter((_to_float(o.price) for o in offers), dtype=np.float64, count=n),
+        "duration": np.fromiter((parse_duration_minutes(o.duration) for o in offers), dtype=np.float64, count=n),
+        "stops": np.fromiter((np.nan if o.stops is None else o.stops for o in offers), dtype=np.float64, count=n),
+        "departure": np.fromiter((_timestamp(o.departure_time) for o in offers), dtype=np.float64, count=n),
+    }
+
+
+def _fill_worst(column: np.ndarray) -> np.ndarray:
+    """Treat unknown values as the worst observed value so they never win."""
+    if not np.isnan(column).any():
+        return column
+    worst = np.nanmax(column) if not np.isnan(column).all() else 0.0
+    return np.where(np.isnan(column), worst, column)
+
+
+def pareto_front(objectives: np.ndarray) -> np.ndarray:
+    """Boolean mask of rows not dominated by any other row, all objectives minimized.
+
+    Expects columns (price, duration, stops) where stops takes few distinct values.
+    Rows are de-duplicated and sorted lexicographically, so any dominating row comes
+    earlier; for each stops level a running minimum of duration over rows with no more
+    stops then finds dominated rows in O(n log n) without pairwise comparisons.
+    """
+    unique, inverse = np.unique(objectives, axis=0, return_inverse=True)
+    duration, stops = unique[:, 1], unique[:, 2]
+    dominated = np.zeros(len(unique), dtype=bool)
+    for level in np.unique(stops):
+        candidates = np.where(stops <= level, duration, np.inf)
+        best_before = np.minimum.accumulate(np.concatenate(([np.inf], candidates[:-1])))
+        dominated |= (stops == level) & (best_before <= duration)
+    return ~dominated[inverse.reshape(-1)]
+
+
+def weighted_scores(objectives: np.ndarray, weights: Sequence[float]) -> np.ndarray:
+    """Min-max normalize each objective to [0, 1] and combine with `weights`."""
+    low = objectives.min(axis=0)
+    span = objectives.max(axis=0) - low
+    span[span == 0] = 1.0
+    return ((objectives - low) / span) @ np.asarray(weights, dtype=np.float64)
+
+
+def rank_offers(offers: Sequence[FlightOffer], preference: str = "balanced", top_k: int = 5) -> dict:
+    """Pick the top-k offers for a preference ("cheapest", "fastest" or "balanced")."""
+    if not offers:
+        return {"flights": [], "offers_considered": 0, "pareto_optimal": 0, "lowest_price": None}
+
+    columns = offers_to_columns(offers)
+    filled = {name: _fill_worst(column) for name, column in columns.items()}
+    objectives = np.column_stack([filled[name] for name in ("price", "duration", "stops")])
+    front = pareto_front(objectives)
+
+    if preference in PREFERENCE_ORDER:
+        # np.lexsort sorts by the last key first; earliest departure breaks remaining ties
+        keys = [filled[name] for name in PREFERENCE_ORDER[preference]]
+        order = np.lexsort([filled["departure"]] + keys[::-1])[:top_k]
+    else:
+        # Front first, then by score, then earliest departure
+        scores = weighted_scores(objectives, BALANCED_WEIGHTS)
+        order = np.lexsort((filled["departure"], scores, ~front))[:top_k]
+    flights: List[FlightOffer] = [offers[i] for i in order]
+    prices = columns["price"]
+    lowest_price = None if np.isnan(prices).all() else float(np.nanmin(prices))
+    return {"flights": flights, "offers_considered": len(offers), "pareto_optimal": int(front.sum()), "lowest_price": lowest_price}
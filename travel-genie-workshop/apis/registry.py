@@ -0,0 +1,95 @@
+"""
+Thread-safe registry of provider clients with startup health probes.
+
+Each provider is built once from its factory (clients raise ValueError when
+their key is not set). At startup every configured provider is probed
+concurrently through its client's `probe(timeout)`, the cheapest authenticated
+call that provider offers: a dead key shows up before the first user request,
+and the TLS connection is already open in the client's pooled session. Probe
+results and latency are published via `status()` for the UI.
+"""
+
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, wait
+from dataclasses import dataclass, replace
+from typing import Any, Callable, Dict, Optional, Tuple
+
+PROBE_TIMEOUT_S = float(os.getenv("PROVIDER_PROBE_TIMEOUT_S", "5"))
+
+
+@dataclass
+class ProviderStatus:
+    label: str
+    state: str = "unknown"  # unknown | unconfigured | checking | ok | error
+    latency_ms: Optional[float] = None
+    error: Optional[str] = None
+    checked_at: Optional[float] = None
+
+
+class ProviderRegistry:
+    """Lazily built, shared provider clients plus their latest health status."""
+
+    def __init__(self, factories: Dict[str, Tuple[str, Callable[[], Any]]], probe_timeout_s: float = PROBE_TIMEOUT_S):
+        self._factories = factories
+        self.probe_timeout_s = probe_timeout_s
+        self._clients: Dict[str, Any] = {}
+        self._status = {name: ProviderStatus(label) for name, (label, _) in factories.items()}
+        self._lock = threading.Lock()
+        self._executor = ThreadPoolExecutor(max_workers=max(len(factories), 1), thread_name_prefix="provider-probe")
+        self._started = False
+
+    def get(self, name: str) -> Optional[Any]:
+        """The shared client for a provider, or None if it is not configured."""
+        with self._lock:
+            if name not in self._clients:
+                _, factory = self._factories[name]
+                try:
+                    self._clients[name] = factory()
+                except ValueError as e:
+                    self._clients[name] = None
+                    self._status[name] = replace(self._status[name], state="unconfigured", error=str(e))
+            return self._clients[name]
+
+    def _set_status(self, name: str, **changes) -> ProviderStatus:
+        with self._lock:
+            self._status[name] = replace(self._status[name], **changes)
+            return self._status[name]
+
+    def probe(self, name: str) -> ProviderStatus:
+        """Validate a provider's key with its cheapest call and record health and latency."""
+        client = self.get(name)
+        if client is None or not hasattr(client, "probe"):
+            return self.status()[name]
+        self._set_status(name, state="checking")
+        started = time.monotonic()
+        try:
+            result = client.probe(self.probe_timeout_s)
+        except Exception as e:
+            result = {"error": str(e)}
+        latency_ms = round((time.monotonic() - started) * 1000, 1)
+        error = result.get("error") if isinstance(result, dict) else None
+        if error:
+            print(f"🔌 {name} probe failed: {error}")
+        return self._set_status(name, state="error" if error else "ok", latency_ms=latency_ms, error=error, checked_at=time.time())
+
+    def probe_all(self, block: bool = False) -> None:
+        """Probe every provider concurrently; by default returns without waiting."""
+        futures = [self._executor.submit(self.probe, name) for name in self._factories]
+        if block:
+            wait(futures)
+
+    def start(self, wait_s: float = 0) -> None:
+        """Kick off the startup probes once per process, waiting up to `wait_s` for them to finish."""
+        with self._lock:
+            if self._started:
+                return
+            self._started = True
+        futures = [self._executor.submit(self.probe, name) for name in self._factories]
+        if wait_s > 0:
+            wait(futures, timeout=wait_s)
+
+    def status(self) -> Dict[str, ProviderStatus]:
+        with self._lock:
+            return dict(self._status)
@@ -4,44 +4,91 @@ https://developer.ticketmaster.com/products-and-docs/apis/discovery-api/v2/
 """
 
 import os
-import requests
-from typing import Optional
+from typing import Iterator, Optional
+
+from .cache import cached
+from .http import RevalidatingSession
+from .memo import memoize
+from .models import Event
+from .pagination import PaginationError, date_window, filter_events
 
 class TicketmasterClient:
     """Client for Ticketmaster Discovery API."""
     
     BASE_URL = "https://app.ticketmaster.com/discovery/v2"
+    EVENTS_TTL_S = 60 * 60
+    PAGE_SIZE = 50
+    MAX_PAGES = 5
     
     def __init__(self):
         self.api_key = os.getenv("TICKETMASTER_API_KEY")
         if not self.api_key:
             raise ValueError("TICKETMASTER_API_KEY environment variable required.")
+        self.session = RevalidatingSession()
+    
+    def probe(self, timeout: float) -> dict:
+        """Health probe: a one-event search."""
+        response = self.session.get(f"{self.BASE_URL}/events.json", params={"apikey": self.api_key, "size": 1}, timeout=timeout)
+        return {"ok": True} if response.status_code == 200 else {"error": f"Ticketmaster probe failed ({response.status_code})"}
     
-    def search_events(self, city: str, keyword: Optional[str] = None, max_results: int = 10) -> dict:
-        """Search for events in a city."""
-        url = f"{self.BASE_URL}/events.json"
-        params = {
-            "apikey": self.api_key,
-            "city": city,
-            "size": max_results,
-            "sort": "date,asc"
-        }
-        if keyword: params["keyword"] = keyword
+    @staticmethod
+    def _parse_event(event: dict) -> Event:
+        return Event(
+            title=event.get("name"),
+            date=event.get("dates", {}).get("start", {}).get("localDate"),
+            time=event.get("dates", {}).get("start", {}).get("localTime"),
+            venue=event.get("_embedded", {}).get("venues", [{}])[0].get("name"),
+            link=event.get("url"),
+            source="ticketmaster",
+        )
+    
+    def iter_events(self, city: str, keyword: Optional[str] = None, start_date: Optional[str] = None, end_date: Optional[str] = None, page_size: int = PAGE_SIZE, max_pages: int = MAX_PAGES) -> Iterator[Event]:
+        """Lazily page through events in date order; pages are fetched only as the caller consumes them."""
+        window_start, window_end = date_window(None, start_date, end_date)
         
-        response = requests.get(url, params=params)
-        if response.status_code != 200:
-            return {"error": f"Ticketmaster API error: {response.text}"}
+        def pages() -> Iterator[Event]:
+            url = f"{self.BASE_URL}/events.json"
+            for page in range(max_pages):
+                params = {
+                    "apikey": self.api_key,
+                    "city": city,
+                    "size": page_size,
+                    "page": page,
+                    "sort": "date,asc"
+                }
+                if keyword: params["keyword"] = keyword
+                if start_date: params["startDateTime"] = f"{start_date}T00:00:00Z"
+                if end_date: params["endDateTime"] = f"{end_date}T23:59:59Z"
+                
+                response = self.session.get(url, params=params)
+                if response.status_code != 200:
+                    raise PaginationError(f"Ticketmaster API error: {response.text}")
+                
+                data = response.json()
+                for event in data.get("_embedded", {}).get("events", []):
+                    try:
+                        parsed = self._parse_event(event)
+                    except Exception: continue
+                    yield parsed
+                if page + 1 >= data.get("page", {}).get("totalPages", 0):
+                    return
         
-        data = response.json()
+        # Ticketmaster already matched the keyword server-side; only dates are re-checked
+        return filter_events(pages(), None, window_start, window_end)
+    
+    @memoize
+    @cached(ttl=EVENTS_TTL_S)
+    def search_events(self, city: str, keyword: Optional[str] = None, max_results: int = 10, start_date: Optional[str] = None, end_date: Optional[str] = None) -> dict:
+        """Search for events in a city, paging until max_results are found."""
+        page_size = min(max_results, self.PAGE_SIZE)
         events = []
-        for event in data.get("_embedded", {}).get("events", []):
-            try:
-                events.append({
-                    "name": event.get("name"),
-                    "date": event.get("dates", {}).get("start", {}).get("localDate"),
-                    "venue": event.get("_embedded", {}).get("venues", [{}])[0].get("name"),
-                    "url": event.get("url")
-                })
-            except: continue
+        try:
+            for event in self.iter_events(city, keyword=keyword, start_date=start_date, end_date=end_date, page_size=page_size):
+                events.append(event)
+                if len(events) >= max_results:
+                    break
+        except PaginationError as e:
+            if not events:
+                return {"error": str(e)}
             
         return {"city": city, "events_found": len(events), "events": events}
@@ -0,0 +1,117 @@
+"""
+Scheduled cache warmer for popular destinations.
+
+Periodically refreshes weather forecasts (which also provide current
+conditions), attractions, restaurants and events for a hot list of cities
+before their cache entries go stale, so first requests for those cities are
+served from cache. The hot list starts from the CITY_TO_AIRPORT cities (or
+HOT_CITIES) and grows with observed query frequency. All calls go through the
+background quota.
+"""
+
+import os
+import threading
+from collections import Counter
+from typing import List, Optional
+
+from .cache import expires_in, refresh
+from .prefetch import AIRPORT_TO_CITY, city_for_destination
+from .quota import QuotaBudget, background_quota
+
+
+class CacheWarmer:
+    """Background thread that keeps hot destinations warm in the response cache."""
+
+    def __init__(
+        self,
+        quota: QuotaBudget = background_quota,
+        cities: Optional[List[str]] = None,
+        interval_s: float = float(os.getenv("CACHE_WARMER_INTERVAL_S", "900")),
+        refresh_ahead_s: float = 300,
+        top_observed: int = 5,
+    ):
+        configured = os.getenv("HOT_CITIES")
+        if cities is None:
+            cities = [c.strip() for c in configured.split(",") if c.strip()] if configured else list(AIRPORT_TO_CITY.values())
+        self.base_cities = cities
+        self.quota = quota
+        self.interval_s = interval_s
+        self.refresh_ahead_s = refresh_ahead_s
+        self.top_observed = top_observed
+        self._queries = Counter()
+        self._lock = threading.Lock()
+        self._stop = threading.Event()
+        self._thread = None
+        self._clients = {}
+
+    def record_query(self, location: str) -> None:
+        """Count a user query for a destination so frequently asked cities get warmed."""
+        city = city_for_destination(location)
+        with self._lock:
+            self._queries[city.title()] += 1
+
+    def hot_cities(self) -> List[str]:
+        """Most-queried cities first, then the configured base list."""
+        with self._lock:
+            observed = [city for city, _ in self._queries.most_common(self.top_observed)]
+        seen = set()
+        ordered = []
+        for city in observed + self.base_cities:
+            if city.lower() not in seen:
+                seen.add(city.lower())
+                ordered.append(city)
+        return ordered
+
+    def _targets(self, city: str) -> list:
+        """(provider, bound method, args) the warmer keeps fresh for a city."""
+        weather = self._clients.get("weather")
+        places = self._clients.get("places")
+        events = self._clients.get("events")
+        targets = []
+        if weather:
+            # Current conditions and all forecast views are derived from this one request
+            targets.append(("weather", weather.fetch_forecast_data, (city,)))
+        if places:
+            targets += [("places", places.get_attractions, (city,)), ("places", places.get_restaurants, (city,))]
+        if events:
+            targets.append(("events", events.get_events, (city,)))
+        return targets
+
+    def warm_once(self) -> dict:
+        """Refresh every hot entry that is missing or about to go stale. Returns counts."""
+        stats = {"refreshed": 0, "fresh": 0, "over_quota": 0, "failed": 0}
+        for city in self.hot_cities():
+            for provider, method, args in self._targets(city):
+                remaining = expires_in(method, *args)
+                if remaining is not None and remaining > self.refresh_ahead_s:
+                    stats["fresh"] += 1
+                    continue
+                if not self.quota.try_acquire(provider):
+                    stats["over_quota"] += 1
+                    continue
+                try:
+                    result = refresh(method, *args)
+                    stats["failed" if isinstance(result, dict) and "error" in result else "refreshed"] += 1
+                except Exception as e:
+                    print(f"🔥 Cache warm for {city} failed: {e}")
+                    stats["failed"] += 1
+        return stats
+
+    def _loop(self) -> None:
+        while not self._stop.is_set():
+            stats = self.warm_once()
+            if stats["refreshed"]:
+                print(f"🔥 Cache warmer refreshed {stats['refreshed']} entries ({stats['over_quota']} skipped for quota)")
+            self._stop.wait(self.interval_s)
+
+    def start(self, weather_client=None, places_client=None, events_client=None) -> None:
+        """Start the warmer thread with whichever clients are configured. Safe to call more than once."""
+        self._clients = {"weather": weather_client, "places": places_client, "events": events_client}
+        if self._thread and self._thread.is_alive():
+            return
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._loop, name="cache-warmer", daemon=True)
+        self._thread.start()
+
+    def stop(self) -> None:
+        self._stop.set()
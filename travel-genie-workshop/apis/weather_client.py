@@ -5,15 +5,27 @@ https://openweathermap.org/api
 
 import os
 import json
-from datetime import datetime, timedelta
-from typing import Optional
-import requests
+import time
+from collections import Counter
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from typing import List, Optional
+
+from .cache import cached
+from .geocode import geocode_cache
+from .http import RevalidatingSession
+from .memo import memoize
+from .models import DailyForecast
 
 
 class WeatherClient:
     """Client for OpenWeatherMap API."""
     
     BASE_URL = "https://api.openweathermap.org/data/2.5"
+    CURRENT_WEATHER_TTL_S = 10 * 60
+    FORECAST_TTL_S = 30 * 60
+    MAX_CONCURRENT_CITIES = 6
     
     def __init__(self):
         self.api_key = os.getenv("OPENWEATHERMAP_API_KEY")
@@ -23,92 +35,211 @@ class WeatherClient:
                 "OPENWEATHERMAP_API_KEY environment variable required. "
                 "Get a free key at: https://openweathermap.org/api"
             )
+        self.session = RevalidatingSession()
+    
+    def probe(self, timeout: float) -> dict:
+        """Health probe: current weather for one city."""
+        response = self.session.get(f"{self.BASE_URL}/weather", params={"q": "London", "appid": self.api_key}, timeout=timeout)
+        return {"ok": True} if response.status_code == 200 else {"error": f"OpenWeatherMap probe failed ({response.status_code})"}
     
+    @memoize
+    @cached(ttl=CURRENT_WEATHER_TTL_S)
     def get_current_weather(self, city: str) -> dict:
         """Get current weather for a city."""
         url = f"{self.BASE_URL}/weather"
-        params = {"q": city, "appid": self.api_key, "units": "metric"}
+        location = self._location_params(city)
+        params = {**location, "appid": self.api_key, "units": "metric"}
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         
         if response.status_code != 200:
             return {"error": f"Failed to get weather: {response.text}"}
         
         data = response.json()
+        if "q" in location:
+            self._remember_location(city, data.get("coord"), data.get("sys", {}).get("country"), data.get("name"))
         
         return {
             "city": data.get("name"),
             "country": data.get("sys", {}).get("country"),
-            "current": {
-                "temperature_c": round(data.get("main", {}).get("temp", 0)),
-                "temperature_f": round(data.get("main", {}).get("temp", 0) * 9/5 + 32),
-                "feels_like_c": round(data.get("main", {}).get("feels_like", 0)),
-                "humidity": data.get("main", {}).get("humidity"),
-                "description": data.get("weather", [{}])[0].get("description", "").title(),
-                "wind_speed_kmh": round(data.get("wind", {}).get("speed", 0) * 3.6),
-            },
+            "current": self._conditions(data),
             "timestamp": datetime.now().isoformat()
         }
     
-    def get_forecast(self, city: str, days: int = 5) -> dict:
-        """Get weather forecast for a city (5-day / 3-hour intervals)."""
+    @staticmethod
+    def _location_params(city: str) -> dict:
+        """Query by coordinates once OpenWeatherMap itself has resolved the city, else by name.
+
+        Places centroids are not used here, so OWM's authoritative coordinates can still replace them.
+        """
+        entry = geocode_cache.get(city)
+        if entry and entry.get("source") == "openweathermap":
+            return {"lat": entry["latitude"], "lon": entry["longitude"]}
+        return {"q": city}
+    
+    @staticmethod
+    def _remember_location(city: str, coord: dict, country: Optional[str], name: Optional[str]) -> None:
+        if coord:
+            geocode_cache.put(city, coord.get("lat"), coord.get("lon"), country=country, name=name, source="openweathermap")
+    
+    @staticmethod
+    def _conditions(slot: dict) -> dict:
+        """The "current" block from a /weather response or a single /forecast slot."""
+        main = slot.get("main", {})
+        return {
+            "temperature_c": round(main.get("temp", 0)),
+            "temperature_f": round(main.get("temp", 0) * 9/5 + 32),
+            "feels_like_c": round(main.get("feels_like", 0)),
+            "humidity": main.get("humidity"),
+            "description": slot.get("weather", [{}])[0].get("description", "").title(),
+            "wind_speed_kmh": round(slot.get("wind", {}).get("speed", 0) * 3.6),
+        }
+    
+    @memoize
+    @cached(ttl=FORECAST_TTL_S)
+    def fetch_forecast_data(self, city: str) -> dict:
+        """Raw 5-day / 3-hour forecast. One cached request serves current conditions and every forecast length."""
         url = f"{self.BASE_URL}/forecast"
-        params = {"q": city, "appid": self.api_key, "units": "metric", "cnt": min(days * 8, 40)}
+        location = self._location_params(city)
+        params = {**location, "appid": self.api_key, "units": "metric"}
         
-        response = requests.get(url, params=params)
+        response = self.session.get(url, params=params)
         
         if response.status_code != 200:
             return {"error": f"Failed to get forecast: {response.text}"}
         
         data = response.json()
-        
-        # Group forecasts by day
-        daily_forecasts = {}
-        
-        for item in data.get("list", []):
-            dt = datetime.fromtimestamp(item["dt"])
+        city_info = data.get("city", {})
+        if "q" in location:
+            self._remember_location(city, city_info.get("coord"), city_info.get("country"), city_info.get("name"))
+        return {"city": city_info, "list": data.get("list", [])}
+    
+    @staticmethod
+    def _daily_forecast(slots: list, utc_offset_s: int, days: int) -> list:
+        """Aggregate 3-hour slots into days in a single pass (slots arrive in time order)."""
+        daily = []
+        current_key = None
+        for item in slots:
+            dt = datetime.fromtimestamp(item["dt"] + utc_offset_s, timezone.utc)
             date_key = dt.strftime("%Y-%m-%d")
+            temp = item["main"]["temp"]
+            description = item["weather"][0]["description"]
             
-            if date_key not in daily_forecasts:
-                daily_forecasts[date_key] = {
-                    "date": date_key, "day_name": dt.strftime("%A"),
-                    "temps": [], "descriptions": []
-                }
-            
-            daily_forecasts[date_key]["temps"].append(item["main"]["temp"])
-            daily_forecasts[date_key]["descriptions"].append(item["weather"][0]["description"])
-        
-        forecast_list = []
-        for date_key, day_data in sorted(daily_forecasts.items())[:days]:
-            temps = day_data["temps"]
-            forecast_list.append({
-                "date": day_data["date"],
-                "day": day_data["day_name"],
-                "temp_high_c": round(max(temps)),
-                "temp_low_c": round(min(temps)),
-                "temp_high_f": round(max(temps) * 9/5 + 32),
-                "temp_low_f": round(min(temps) * 9/5 + 32),
-                "description": max(set(day_data["descriptions"]), key=day_data["descriptions"].count).title(),
-            })
+            if date_key != current_key:
+                if len(daily) == days:
+                    break
+                current_key = date_key
+                day = {"date": date_key, "day": dt.strftime("%A"), "high": temp, "low": temp, "descriptions": Counter()}
+                daily.append(day)
+            else:
+                day["high"] = max(day["high"], temp)
+                day["low"] = min(day["low"], temp)
+            day["descriptions"][description] += 1
+        
+        return [
+            DailyForecast(
+                date=day["date"],
+                day=day["day"],
+                temp_high_c=round(day["high"]),
+                temp_low_c=round(day["low"]),
+                temp_high_f=round(day["high"] * 9/5 + 32),
+                temp_low_f=round(day["low"] * 9/5 + 32),
+                description=day["descriptions"].most_common(1)[0][0].title(),
+            )
+            for day in daily
+        ]
+    
+    @staticmethod
+    def _nearest_slot(slots: list) -> dict:
+        """The 3-hour slot closest to now; a cached forecast's first slot may already be in the past."""
+        now = time.time()
+        return min(slots, key=lambda slot: abs(slot["dt"] - now))
+    
+    @memoize
+    def get_conditions(self, city: str, days: int = 5) -> dict:
+        """Current conditions (nearest forecast slot) plus the daily forecast, from one forecast request."""
+        data = self.fetch_forecast_data(city)
         
+        if "error" in data:
+            return data
+        
+        slots = data["list"]
+        city_info = data["city"]
         return {
-            "city": data.get("city", {}).get("name", city),
-            "country": data.get("city", {}).get("country"),
-            "forecast_days": len(forecast_list),
-            "forecast": forecast_list
+            "city": city_info.get("name", city),
+            "country": city_info.get("country"),
+            "current": self._conditions(self._nearest_slot(slots)) if slots else {},
+            "forecast": self._daily_forecast(slots, city_info.get("timezone", 0), days),
         }
     
-    def get_weather_for_trip(self, city: str, start_date: str, end_date: str) -> dict:
-        """Get weather information for a trip with packing suggestions."""
-        current = self.get_current_weather(city)
-        forecast = self.get_forecast(city, days=5)
+    @memoize
+    def get_forecast(self, city: str, days: int = 5) -> dict:
+        """Get weather forecast for a city (5-day / 3-hour intervals)."""
+        conditions = self.get_conditions(city, days)
+        
+        if "error" in conditions:
+            return {"error": conditions["error"]}
+        
+        return {
+            "city": conditions["city"],
+            "country": conditions["country"],
+            "forecast_days": len(conditions["forecast"]),
+            "forecast": conditions["forecast"]
+        }
+    
+    def get_forecasts(self, cities: List[str], days: int = 5) -> dict:
+        """Current conditions and forecasts for several cities, fetched concurrently."""
+        # "Paris" and "paris " are one city; keep the first spelling given
+        unique = {}
+        for city in cities:
+            if city and city.strip():
+                unique.setdefault(city.strip().casefold(), city.strip())
+        cities = list(unique.values())
+        if not cities:
+            return {"error": "No cities given"}
         
-        if "error" in current or "error" in forecast:
-            return {"error": current.get("error") or forecast.get("error")}
+        with ThreadPoolExecutor(max_workers=min(self.MAX_CONCURRENT_CITIES, len(cities))) as executor:
+            # Each worker runs in a copy of the caller's context so the turn memo applies
+            futures = [executor.submit(contextvars.copy_context().run, self.get_conditions, city, days) for city in cities]
         
-        # Determine packing suggestions
-        avg_temp = sum(f["temp_high_c"] for f in forecast.get("forecast", [])) / max(len(forecast.get("forecast", [])), 1)
-        descriptions = " ".join(f.get("description", "").lower() for f in forecast.get("forecast", []))
+        forecasts = {}
+        errors = {}
+        for city, future in zip(cities, futures):
+            try:
+                result = future.result()
+            except Exception as e:
+                result = {"error": str(e)}
+            if "error" in result:
+                errors[city] = result["error"]
+            else:
+                forecasts[city] = result
+        response = {"cities_found": len(forecasts), "cities": forecasts}
+        if errors:
+            response["errors"] = errors
+        return response
+    
+    @memoize
+    def get_weather_for_stay(self, city: str, check_in: str, check_out: str) -> dict:
+        """Forecast days within [check_in, check_out) only; stays past the 5-day horizon get an explicit note."""
+        conditions = self.get_conditions(city, days=6)
+        
+        if "error" in conditions:
+            return {"error": conditions["error"]}
+        
+        forecast = [day for day in conditions["forecast"] if check_in <= day.date < check_out]
+        if not forecast:
+            return {"city": conditions["city"], "stay": f"{check_in} to {check_out}", "forecast": [], "note": "No forecast yet: the stay is beyond the 5-day forecast window."}
+        return {
+            "city": conditions["city"],
+            "stay": f"{check_in} to {check_out}",
+            "forecast": forecast,
+            "packing_suggestions": self._packing_tips(forecast)
+        }
+    
+    @staticmethod
+    def _packing_tips(forecast: list) -> list:
+        avg_temp = sum(f.temp_high_c for f in forecast) / max(len(forecast), 1)
+        descriptions = " ".join(f.description.lower() for f in forecast)
         
         packing_tips = []
         if avg_temp < 10:
@@ -122,12 +253,21 @@ class WeatherClient:
             packing_tips.append("Umbrella/Rain jacket")
         if "sun" in descriptions or "clear" in descriptions:
             packing_tips.append("Sunglasses/Sunscreen")
+        return packing_tips
+    
+    @memoize
+    def get_weather_for_trip(self, city: str, start_date: str, end_date: str) -> dict:
+        """Get weather information for a trip with packing suggestions (one forecast request)."""
+        conditions = self.get_conditions(city, days=5)
+        
+        if "error" in conditions:
+            return {"error": conditions["error"]}
         
         return {
-            "city": current.get("city"),
-            "country": current.get("country"),
+            "city": conditions["city"],
+            "country": conditions["country"],
             "trip_dates": f"{start_date} to {end_date}",
-            "current_weather": current.get("current"),
-            "forecast": forecast.get("forecast", []),
-            "packing_suggestions": list(set(packing_tips))
+            "current_weather": conditions["current"],
+            "forecast": conditions["forecast"],
+            "packing_suggestions": self._packing_tips(conditions["forecast"])
         }
@@ -1,12 +1,57 @@
 """TravelGenie Live - AI Travel Concierge with Real APIs"""
 
+import html
 import streamlit as st
-import os
 from langchain_core.messages import HumanMessage, AIMessage, ToolMessage, SystemMessage
-from agent import app as agent_app, SYSTEM_PROMPT
+from agent import run_turn, compact_history, providers, start_cache_warmer, start_providers, SYSTEM_PROMPT
 
 st.set_page_config(page_title="TravelGenie Live ✈️", page_icon="✈️", layout="wide")
 
+
+@st.cache_resource
+def start_background_services() -> bool:
+    """Start process-wide background work once, not on every rerun."""
+    start_providers()
+    start_cache_warmer()
+    return True
+
+
+start_background_services()
+
+# Older messages are collapsed behind a "show more" control
+HISTORY_PAGE_SIZE = 10
+
+
+def queue_prompt(prompt: str) -> None:
+    """Button callback: runs before the rerun, so the prompt is handled in the same pass."""
+    st.session_state.pending = prompt
+
+
+def clear_chat() -> None:
+    st.session_state.messages = []
+    st.session_state.display_cache = {"count": 0, "entries": []}
+    st.session_state.history_shown = HISTORY_PAGE_SIZE
+
+
+def show_more_history() -> None:
+    st.session_state.history_shown += HISTORY_PAGE_SIZE
+
+
+def display_entries() -> list:
+    """(role, markdown) entries for the chat, extended only with messages added since the last rerun."""
+    messages = st.session_state.messages
+    cache = st.session_state.display_cache
+    if cache["count"] > len(messages):
+        cache = st.session_state.display_cache = {"count": 0, "entries": []}
+    for msg in messages[cache["count"]:]:
+        if isinstance(msg, HumanMessage):
+            cache["entries"].append(("user", msg.content))
+        elif isinstance(msg, AIMessage) and msg.content:
+            cache["entries"].append(("assistant", msg.content))
+    cache["count"] = len(messages)
+    return cache["entries"]
+
+
 # Custom CSS
 st.markdown("""
 <style>
@@ -38,6 +83,7 @@ st.markdown("""
     .api-status { padding: 0.5rem; border-radius: 8px; margin-bottom: 0.5rem; font-size: 0.85rem; }
     .api-ok { background: rgba(16, 185, 129, 0.1); border: 1px solid rgba(16, 185, 129, 0.3); color: #10b981; }
     .api-error { background: rgba(239, 68, 68, 0.1); border: 1px solid rgba(239, 68, 68, 0.3); color: #ef4444; }
+    .api-pending { background: rgba(148, 163, 184, 0.1); border: 1px solid rgba(148, 163, 184, 0.3); color: #94a3b8; }
     
     .stButton > button {
         background: linear-gradient(135deg, #3b82f6, #8b5cf6);
@@ -53,23 +99,31 @@ st.markdown("# ✈️ TravelGenie Live")
 st.markdown('<p class="subtitle">AI Travel Concierge with Real-Time Data</p>', unsafe_allow_html=True)
 st.markdown('<div class="live-badge">🟢 LIVE DATA</div>', unsafe_allow_html=True)
 
+# Seconds between sidebar status refreshes; only this fragment reruns
+STATUS_REFRESH_S = 5
+
+
+@st.fragment(run_every=STATUS_REFRESH_S)
+def provider_status() -> None:
+    """Live results of the provider probes (key validity and round-trip latency)."""
+    status_icons = {"ok": "✅", "error": "❌", "unconfigured": "❌", "checking": "⏳", "unknown": "⏳"}
+    for status in providers.status().values():
+        if status.state == "ok":
+            status_class, detail = "api-ok", f" · {status.latency_ms:.0f} ms"
+        elif status.state in ("error", "unconfigured"):
+            status_class, detail = "api-error", " · not configured" if status.state == "unconfigured" else " · key rejected or unreachable"
+        else:
+            status_class, detail = "api-pending", " · checking"
+        tooltip = html.escape(status.error or "", quote=True)
+        st.markdown(f'<div class="api-status {status_class}" title="{tooltip}">{status_icons[status.state]} {status.label}{detail}</div>', unsafe_allow_html=True)
+    st.button("🔄 Re-check APIs", on_click=providers.probe_all, kwargs={"block": True})
+
+
 # Sidebar
 with st.sidebar:
     st.markdown("## 🔌 API Status")
     
-    api_status = {
-        "Duffel (Flights)": bool(os.getenv("DUFFEL_API_KEY")),
-        "Booking.com (Hotels)": bool(os.getenv("RAPIDAPI_KEY")),
-        "OpenWeatherMap": bool(os.getenv("OPENWEATHERMAP_API_KEY")),
-        "Google Places": bool(os.getenv("GOOGLE_PLACES_API_KEY")),
-        "SerpAPI (Events)": bool(os.getenv("SERPAPI_API_KEY")),
-        "Ticketmaster": bool(os.getenv("TICKETMASTER_API_KEY"))
-    }
-    
-    for api, is_configured in api_status.items():
-        status_class = "api-ok" if is_configured else "api-error"
-        icon = "✅" if is_configured else "❌"
-        st.markdown(f'<div class="api-status {status_class}">{icon} {api}</div>', unsafe_allow_html=True)
+    provider_status()
     
     st.markdown("---")
     st.markdown("## 💡 Try These")
@@ -82,33 +136,27 @@ with st.sidebar:
     ]
     
     for ex in examples:
-        if st.button(f"📌 {ex[:32]}...", key=ex):
-            st.session_state.suggested_prompt = ex
+        st.button(f"📌 {ex[:32]}...", key=ex, on_click=queue_prompt, args=(ex,))
     
     st.markdown("---")
-    if st.button("🗑️ Clear Chat"):
-        st.session_state.messages = []
-        st.rerun()
+    st.button("🗑️ Clear Chat", on_click=clear_chat)
 
 # Initialize state
 if "messages" not in st.session_state:
     st.session_state.messages = []
+if "display_cache" not in st.session_state:
+    st.session_state.display_cache = {"count": 0, "entries": []}
+if "history_shown" not in st.session_state:
+    st.session_state.history_shown = HISTORY_PAGE_SIZE
 
-# Display history
-for msg in st.session_state.messages:
-    if isinstance(msg, HumanMessage):
-        with st.chat_message("user"):
-            st.markdown(msg.content)
-    elif isinstance(msg, AIMessage) and msg.content:
-        with st.chat_message("assistant"):
-            st.markdown(msg.content)
-
-# Handle suggested prompts
-if "suggested_prompt" in st.session_state:
-    prompt = st.session_state.suggested_prompt
-    del st.session_state.suggested_prompt
-    st.session_state.pending = prompt
-    st.rerun()
+# Display history, newest page only unless expanded
+entries = display_entries()
+hidden = max(len(entries) - st.session_state.history_shown, 0)
+if hidden:
+    st.button(f"⬆️ Show earlier messages ({hidden} hidden)", on_click=show_more_history)
+for role, content in entries[hidden:]:
+    with st.chat_message(role):
+        st.markdown(content)
 
 # Chat input
 user_input = st.chat_input("Ask about real flights, hotels, weather, or events! 🌍")
@@ -127,10 +175,11 @@ if user_input:
         with st.spinner("🔍 Fetching REAL data..."):
             try:
                 conversation = [SystemMessage(content=SYSTEM_PROMPT)] + list(st.session_state.messages)
-                result = agent_app.invoke({"messages": conversation})
+                result = run_turn(conversation)
                 
+                # Keep only blob references to tool payloads in the session
                 new_messages = [m for m in result["messages"] if not isinstance(m, SystemMessage)]
-                st.session_state.messages = new_messages
+                st.session_state.messages = compact_history(new_messages)
                 
                 final = result["messages"][-1]
                 if isinstance(final, AIMessage) and final.content: